@@ -75,13 +75,18 @@ setup(
         "pyyaml>=6.0,<7.0",
         "pydantic>=1.10.7,<2.0",
     ],
-    extras_require={},
+    extras_require={
+        "numpy": ["numpy"],
+    },
     setup_requires=[
         "pytest-runner",
     ],
     entry_points={
         "console_scripts": [
             "fritzing-stripboard = fritzing_stripboard.cli:main",
+            "fritzing-stripboard-batch = fritzing_stripboard.cli:batch",
+            "fritzing-stripboard-compile = fritzing_stripboard.cli:compile_spec",
+            "fritzing-stripboard-server = fritzing_stripboard.cli:server",
         ]
     },
 )
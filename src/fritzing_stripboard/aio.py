@@ -0,0 +1,176 @@
+"""Building parts from asyncio applications without blocking the loop.
+
+``build_part_files_async`` and ``build_zip_async`` run their synchronous
+counterparts on an executor -- the loop's default thread pool unless
+another is given -- and take an ``asyncio.Semaphore`` to bound how many
+builds run at once, shared by every call given the same one.
+
+Cancelling a build on a thread stops it at its next plan step, with
+large components tiled so that steps stay short, or, once the plan has
+run, every few thousand holes while the documents are filled.  Archives
+are always streamed on threads, since serializing a whole document
+cannot be interrupted; the output is the same.  The call only returns
+(by raising ``CancelledError``) once the build has stopped, so the
+semaphore never admits more builds than it should.  For the same
+reason, builds on threads run every grid in that thread, whatever
+``workers`` is.
+
+Process pools cannot be reached that way: a build waiting for a worker
+is dropped, but one already running finishes in the background.  Their
+arguments must be picklable, and objects the build updates, such as
+``holes`` or ``svg_format.saved_bytes``, are only updated in the
+worker's copy.
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+import contextlib
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Optional
+from xml.etree import ElementTree
+
+from .progress import ProgressMonitor
+from .tiles import DEFAULT_TILE_SIZE
+from .types import BoardSpecification
+from .zip import build_part_files, build_zip_bytes
+
+
+#: Bytes written to an output sink before letting the loop run again.
+CHUNK_SIZE = 64 * 1024
+
+
+class BuildCancelled(Exception):
+    pass
+
+
+class CancellationMonitor:
+    """Stops a build at its next plan step once ``event`` is set.
+
+    Everything else is passed on to ``progress``, if given.
+    """
+
+    def __init__(
+        self, event: threading.Event, progress: Optional[ProgressMonitor] = None
+    ):
+        self.event = event
+        self.progress = progress
+
+    def start(self, total: int) -> None:
+        if self.progress is not None:
+            self.progress.start(total)
+
+    def check(self) -> None:
+        if self.event.is_set():
+            raise BuildCancelled()
+
+    def advance(self, holes: int) -> None:
+        self.check()
+        if self.progress is not None:
+            self.progress.advance(holes)
+
+    def finish(self) -> None:
+        if self.progress is not None:
+            self.progress.finish()
+
+
+def _call_build(
+    function: Callable[..., Any],
+    board: BoardSpecification,
+    cancel: Optional[threading.Event],
+    kwargs: dict[str, Any],
+) -> Any:
+    if cancel is not None:
+        monitor = CancellationMonitor(cancel, kwargs.get("progress"))
+        kwargs = {
+            **kwargs,
+            "progress": monitor,
+            "tile_size": kwargs.get("tile_size") or DEFAULT_TILE_SIZE,
+        }
+        if function is build_part_files:
+            kwargs["checkpoint"] = monitor.check
+        else:
+            kwargs["stream"] = True
+    return function(board, **kwargs)
+
+
+async def _run_build(
+    function: Callable[..., Any],
+    board: BoardSpecification,
+    executor: Optional[Executor],
+    limit: Optional[asyncio.Semaphore],
+    kwargs: dict[str, Any],
+) -> Any:
+    loop = asyncio.get_running_loop()
+
+    async with limit if limit is not None else contextlib.nullcontext():
+        if isinstance(executor, ProcessPoolExecutor):
+            return await loop.run_in_executor(
+                executor, functools.partial(_call_build, function, board, None, kwargs)
+            )
+
+        cancel = threading.Event()
+        future = loop.run_in_executor(
+            executor, functools.partial(_call_build, function, board, cancel, kwargs)
+        )
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            cancel.set()
+            await asyncio.wait([future])
+            if not future.cancelled():
+                future.exception()
+            raise
+
+
+async def write_async(output: Any, data: bytes) -> None:
+    """Write ``data`` to ``output``, letting the loop run between chunks.
+
+    ``output``'s ``write`` may be a coroutine, as for ``aiofiles``, or,
+    as for ``asyncio.StreamWriter``, a plain method paired with a
+    ``drain`` coroutine, which is awaited after every chunk.
+    """
+    drain = getattr(output, "drain", None)
+    for offset in range(0, len(data), CHUNK_SIZE):
+        end = offset + CHUNK_SIZE
+        result = output.write(data[offset:end])
+        if inspect.isawaitable(result):
+            await result
+        if drain is not None:
+            await drain()
+
+
+async def build_part_files_async(
+    board: BoardSpecification,
+    executor: Optional[Executor] = None,
+    limit: Optional[asyncio.Semaphore] = None,
+    **kwargs,
+) -> tuple[ElementTree.Element, dict[str, ElementTree.Element]]:
+    """Run ``build_part_files`` on ``executor``; see the module docstring."""
+    return await _run_build(build_part_files, board, executor, limit, kwargs)
+
+
+async def build_zip_async(
+    board: BoardSpecification,
+    output: Any = None,
+    executor: Optional[Executor] = None,
+    limit: Optional[asyncio.Semaphore] = None,
+    **kwargs,
+) -> Optional[bytes]:
+    """Build ``board``'s part archive on ``executor``.
+
+    The archive is returned, or written to ``output`` with
+    ``write_async`` if given.  ``kwargs`` are passed to ``build_zip``.
+
+    >>> board = BoardSpecification.parse_obj(
+    ...     {"meta": {"width": 10, "height": 10, "title": "Test", "label": "T"}}
+    ... )
+    >>> asyncio.run(build_zip_async(board))[:2]
+    b'PK'
+    """
+    data = await _run_build(build_zip_bytes, board, executor, limit, kwargs)
+    if output is None:
+        return data
+
+    await write_async(output, data)
+    return None
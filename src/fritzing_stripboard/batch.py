@@ -0,0 +1,200 @@
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import glob
+import os
+import time
+from typing import Iterable, NamedTuple, Optional
+import zipfile
+
+from .cache import BuildCache
+from .emitters import SvgFormat
+from .loader import load_specification
+from .zip import build_zip
+
+
+SPEC_EXTENSIONS = (".yaml", ".yml", ".json")
+
+
+class BatchResult(NamedTuple):
+    path: str
+    output: str
+    duration: float
+    error: Optional[str] = None
+    cached: bool = False
+
+
+class BatchSummary(NamedTuple):
+    results: list[BatchResult]
+    duration: float
+
+    @property
+    def failures(self) -> list[BatchResult]:
+        return [result for result in self.results if result.error is not None]
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for result in self.results if result.cached)
+
+    @property
+    def specs_per_second(self) -> float:
+        if not self.duration:
+            return 0.0
+        return len(self.results) / self.duration
+
+
+def read_manifest(path: str) -> list[str]:
+    """Read spec paths, one per line, relative to the manifest's directory.
+
+    Blank lines and lines starting with ``#`` are ignored.
+    """
+    base = os.path.dirname(path)
+    paths: list[str] = []
+
+    with open(path, "r") as inf:
+        for line in inf:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            paths.append(os.path.join(base, line))
+
+    return paths
+
+
+def collect_specs(sources: Iterable[str]) -> list[str]:
+    """Expand directories and glob patterns into a list of spec paths."""
+    paths: list[str] = []
+
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(
+                sorted(
+                    os.path.join(source, name)
+                    for name in os.listdir(source)
+                    if name.endswith(SPEC_EXTENSIONS)
+                )
+            )
+        elif glob.has_magic(source):
+            paths.extend(sorted(glob.glob(source, recursive=True)))
+        else:
+            paths.append(source)
+
+    return list(dict.fromkeys(paths))
+
+
+def get_output_paths(paths: list[str], output_dir: str) -> list[str]:
+    """The archive each of ``paths`` is built to within ``output_dir``.
+
+    Archives are named after their spec and laid out like the specs
+    below the deepest directory holding all of them, so that specs with
+    the same name in different directories do not overwrite each other.
+    Raises ``ValueError`` if two specs would still share an archive.
+
+    >>> get_output_paths(["a/board.yaml", "b/board.yaml"], "parts")
+    ['parts/a/board.fzpz', 'parts/b/board.fzpz']
+    """
+    if not paths:
+        return []
+
+    directories = [os.path.dirname(os.path.abspath(path)) for path in paths]
+    root = os.path.commonpath(directories)
+    outputs: list[str] = []
+    sources: dict[str, str] = {}
+
+    for path, directory in zip(paths, directories):
+        name = os.path.splitext(os.path.basename(path))[0]
+        output = os.path.normpath(
+            os.path.join(output_dir, os.path.relpath(directory, root), f"{name}.fzpz")
+        )
+        other = sources.setdefault(os.path.normcase(output), path)
+        if other != path:
+            raise ValueError(f"{other} and {path} would both be built to {output}")
+        outputs.append(output)
+
+    return outputs
+
+
+def build_spec_file(
+    path: str,
+    output: str,
+    stream: bool = False,
+    cache: Optional[BuildCache] = None,
+    merge_overlaps: bool = False,
+    merge_nets: bool = False,
+    compression: int = zipfile.ZIP_STORED,
+    compresslevel: Optional[int] = None,
+    compact_svg: Optional[int] = None,
+) -> BatchResult:
+    started = time.perf_counter()
+    hits = cache.hits if cache is not None else 0
+
+    try:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(path, "r") as inf:
+            loaded = load_specification(inf)
+        build_zip(
+            loaded,
+            output,
+            stream=stream,
+            cache=cache,
+            merge_overlaps=merge_overlaps,
+            merge_nets=merge_nets,
+            compression=compression,
+            compresslevel=compresslevel,
+            svg_format=SvgFormat(compact_svg) if compact_svg is not None else None,
+        )
+    except Exception as exc:
+        return BatchResult(
+            path=path,
+            output=output,
+            duration=time.perf_counter() - started,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+
+    return BatchResult(
+        path=path,
+        output=output,
+        duration=time.perf_counter() - started,
+        cached=cache is not None and cache.hits > hits,
+    )
+
+
+def build_batch(
+    paths: list[str],
+    output_dir: str,
+    workers: Optional[int] = None,
+    stream: bool = False,
+    cache: Optional[BuildCache] = None,
+    merge_overlaps: bool = False,
+    merge_nets: bool = False,
+    compression: int = zipfile.ZIP_STORED,
+    compresslevel: Optional[int] = None,
+    compact_svg: Optional[int] = None,
+) -> BatchSummary:
+    """Build every spec in ``paths`` into ``output_dir``.
+
+    See ``get_output_paths`` for where each archive goes.  A failing spec
+    is recorded in its result rather than aborting the batch.  With
+    ``workers`` set to 1 everything runs in this process.
+    """
+    outputs = get_output_paths(paths, output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+
+    build = functools.partial(
+        build_spec_file,
+        stream=stream,
+        cache=cache,
+        merge_overlaps=merge_overlaps,
+        merge_nets=merge_nets,
+        compression=compression,
+        compresslevel=compresslevel,
+        compact_svg=compact_svg,
+    )
+
+    if workers == 1:
+        results = [build(path, output) for path, output in zip(paths, outputs)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(build, paths, outputs))
+
+    return BatchSummary(results=results, duration=time.perf_counter() - started)
@@ -0,0 +1,394 @@
+"""Benchmarks for generating synthetic boards of increasing size.
+
+Run with ``python -m fritzing_stripboard.benchmark``; see ``--help``.
+"""
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+from xml.etree import ElementTree
+import zipfile
+
+import yaml
+
+from . import __version__
+from .grid import get_numpy
+from .loader import parse_raw_specification
+from .types import BoardSpecification
+from .zip import build_part_files, get_svg_entry_name, stream_part_files
+
+
+DEFAULT_SIZES = [10**3, 10**4, 10**5, 10**6]
+DEFAULT_DENSITIES = [1.0, 0.5]
+DEFAULT_TOLERANCE = 0.2
+#: Slowdowns smaller than this many seconds are treated as noise.
+MINIMUM_REGRESSION = 0.005
+
+#: Every block spans all 26 single-letter columns and this many rows.
+BLOCK_ROWS = 20
+BLOCKS_PER_GRID = 50
+
+PHASES = ["yaml_load", "validate", "build", "serialize", "zip", "stream"]
+
+#: Commands whose cold start time is measured, each run in a fresh
+#: interpreter; ``{spec}`` is replaced with the path of a small spec.
+STARTUP_COMMANDS = {
+    "import": ["-c", "import fritzing_stripboard.cli"],
+    "check": ["-m", "fritzing_stripboard", "{spec}", "--check"],
+    "build": ["-m", "fritzing_stripboard", "{spec}", "{output}"],
+}
+STARTUP_HOLES = 100
+
+
+def get_block_components(row: int, index: int) -> list[dict[str, Any]]:
+    """Components for one 26 x 20 cell block starting at ``row``.
+
+    Mixes a nested ``shared_bus``, ``drilled_rows`` and ``drilled_columns``
+    so that every handler is exercised; about 515 holes per block.
+    """
+    return [
+        {
+            "id": f"bus-{index}",
+            "shared_bus": [
+                {"id": f"bus-{index}-top", "bus": f"A{row}:Z{row}"},
+                {
+                    "id": f"bus-{index}-nested",
+                    "shared_bus": [
+                        {
+                            "id": f"bus-{index}-left",
+                            "drilled": f"A{row + 1}:A{row + 4}",
+                        },
+                    ],
+                },
+            ],
+        },
+        {"id": f"rows-{index}", "drilled_rows": f"B{row + 1}:M{row + 9}"},
+        {"id": f"columns-{index}", "drilled_columns": f"N{row + 1}:Z{row + 9}"},
+        {"id": f"block-{index}", "drilled_rows": f"A{row + 10}:Z{row + 19}"},
+    ]
+
+
+def generate_spec(holes: int, density: float = 1.0) -> dict[str, Any]:
+    """Generate a raw board spec with roughly ``holes`` holes.
+
+    ``density`` is the fraction of the board's rows that contain holes;
+    lower densities spread the same blocks over a taller grid.
+    """
+    pitch = 2.54
+    block_height = math.ceil(BLOCK_ROWS / density)
+    block_count = max(1, math.ceil(holes / 515))
+    grid_count = math.ceil(block_count / BLOCKS_PER_GRID)
+    grid_height = BLOCKS_PER_GRID * block_height * pitch
+
+    board = []
+    for grid_index in range(grid_count):
+        components = []
+        for block in range(BLOCKS_PER_GRID):
+            index = grid_index * BLOCKS_PER_GRID + block
+            if index >= block_count:
+                break
+            components.extend(get_block_components(block * block_height, index))
+
+        board.append(
+            {
+                "grid": {
+                    "meta": {"origin": [0, grid_index * grid_height], "pitch": pitch},
+                    "components": components,
+                }
+            }
+        )
+
+    return {
+        "meta": {
+            "id": f"benchmark-{holes}-{density}",
+            "title": f"Benchmark board ({holes} holes, density {density})",
+            "label": "benchmark",
+            "date": "2000-01-01T00:00:00",
+            "width": 26 * pitch,
+            "height": grid_count * grid_height,
+        },
+        "board": board,
+    }
+
+
+def _run_phases(text: str) -> dict[str, Any]:
+    """Prepare one run of every phase as ``(phase, step)`` pairs.
+
+    Steps share ``state`` and must be called in order.
+    """
+    state: dict[str, Any] = {}
+
+    def yaml_load():
+        state["raw"] = parse_raw_specification(text)
+
+    def validate():
+        state["board"] = BoardSpecification.parse_obj(state["raw"])
+
+    def build():
+        state["documents"] = build_part_files(state["board"])
+
+    def serialize():
+        fzp_document, svg_documents = state["documents"]
+        state["bytes"] = (
+            ElementTree.tostring(fzp_document),
+            {
+                view: ElementTree.tostring(document)
+                for view, document in svg_documents.items()
+            },
+        )
+
+    def write_zip():
+        board = state["board"]
+        fzp_bytes, svg_bytes = state["bytes"]
+        with tempfile.TemporaryFile() as outf, zipfile.ZipFile(
+            outf, mode="w"
+        ) as archive:
+            archive.writestr(f"part.{board.meta.id}.fzp", fzp_bytes)
+            for view, svg in svg_bytes.items():
+                archive.writestr(get_svg_entry_name(board, view), svg)
+        del state["documents"], state["bytes"], fzp_bytes, svg_bytes
+
+    def stream():
+        with tempfile.TemporaryFile() as outf, zipfile.ZipFile(
+            outf, mode="w"
+        ) as archive:
+            stream_part_files(state["board"], archive)
+
+    steps: list[Callable[[], None]] = [
+        yaml_load,
+        validate,
+        build,
+        serialize,
+        write_zip,
+        stream,
+    ]
+    return {"state": state, "steps": list(zip(PHASES, steps))}
+
+
+def measure(text: str, repeat: int = 1, memory: bool = True) -> dict[str, Any]:
+    """Time every phase of building the spec serialized in ``text``.
+
+    Each phase's time is the fastest of ``repeat`` runs.  Peak memory is
+    measured in one additional run under ``tracemalloc`` so that tracing
+    does not distort the timings.
+    """
+    seconds: dict[str, float] = {}
+    hole_count = 0
+
+    for _ in range(repeat):
+        run = _run_phases(text)
+        for phase, step in run["steps"]:
+            started = time.perf_counter()
+            step()
+            elapsed = time.perf_counter() - started
+            seconds[phase] = min(seconds.get(phase, elapsed), elapsed)
+            if phase == "build":
+                fzp_document, _ = run["state"]["documents"]
+                hole_count = len(fzp_document.find("connectors"))
+                del fzp_document
+
+    peak_bytes: dict[str, int] = {}
+    if memory:
+        run = _run_phases(text)
+        tracemalloc.start()
+        try:
+            for phase, step in run["steps"]:
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+                step()
+                _, peak = tracemalloc.get_traced_memory()
+                peak_bytes[phase] = peak - baseline
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "holes": hole_count,
+        "phases": {
+            phase: {"seconds": seconds[phase], "peak_bytes": peak_bytes.get(phase)}
+            for phase in PHASES
+        },
+    }
+
+
+def measure_startup(repeat: int = 5) -> dict[str, float]:
+    """Fastest wall time of each of ``STARTUP_COMMANDS``, in seconds."""
+    seconds: dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        spec = f"{directory}/board.yaml"
+        with open(spec, "w") as outf:
+            yaml.safe_dump(generate_spec(STARTUP_HOLES), outf)
+        output = f"{directory}/board.fzpz"
+
+        for name, command in STARTUP_COMMANDS.items():
+            arguments = [
+                argument.format(spec=spec, output=output) for argument in command
+            ]
+            for _ in range(repeat):
+                started = time.perf_counter()
+                subprocess.run([sys.executable, *arguments], check=True)
+                elapsed = time.perf_counter() - started
+                seconds[name] = min(seconds.get(name, elapsed), elapsed)
+
+    return seconds
+
+
+def run_benchmarks(
+    sizes: list[int],
+    densities: list[float],
+    repeat: int = 1,
+    memory: bool = True,
+    startup: bool = True,
+) -> dict[str, Any]:
+    results = []
+
+    for size in sizes:
+        for density in densities:
+            text = yaml.safe_dump(generate_spec(size, density))
+            result = measure(text, repeat=repeat, memory=memory)
+            result.update({"size": size, "density": density})
+            results.append(result)
+            print(
+                f"{size:>9} holes @ {density:<4}: "
+                + ", ".join(
+                    f"{phase} {result['phases'][phase]['seconds']:.3f}s"
+                    for phase in PHASES
+                ),
+                file=sys.stderr,
+            )
+
+    startup_seconds = measure_startup() if startup else {}
+    for name, elapsed in startup_seconds.items():
+        print(f"startup {name}: {elapsed:.3f}s", file=sys.stderr)
+
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "numpy": get_numpy() is not None,
+        "startup": startup_seconds,
+        "results": results,
+    }
+
+
+def compare(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[str]:
+    """Describe every phase that got slower than ``baseline`` allows."""
+    previous = {
+        (result["size"], result["density"]): result for result in baseline["results"]
+    }
+    regressions = []
+
+    for name, seconds in current.get("startup", {}).items():
+        previous_seconds = baseline.get("startup", {}).get(name)
+        if previous_seconds is None:
+            continue
+        limit = max(
+            previous_seconds * (1 + tolerance),
+            previous_seconds + MINIMUM_REGRESSION,
+        )
+        if seconds > limit:
+            regressions.append(
+                f"startup {name}: {seconds:.3f}s > {previous_seconds:.3f}s"
+            )
+
+    for result in current["results"]:
+        before = previous.get((result["size"], result["density"]))
+        if before is None:
+            continue
+        for phase, timing in result["phases"].items():
+            if phase not in before["phases"]:
+                continue
+            previous_seconds = before["phases"][phase]["seconds"]
+            limit = max(
+                previous_seconds * (1 + tolerance),
+                previous_seconds + MINIMUM_REGRESSION,
+            )
+            if timing["seconds"] > limit:
+                regressions.append(
+                    f"{result['size']} holes @ {result['density']} {phase}: "
+                    f"{timing['seconds']:.3f}s > "
+                    f"{previous_seconds:.3f}s"
+                )
+
+    return regressions
+
+
+def main(args: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--densities", type=float, nargs="+", default=DEFAULT_DENSITIES)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Skip the tracemalloc run that measures peak memory.",
+    )
+    parser.add_argument(
+        "--no-startup",
+        action="store_true",
+        help="Skip measuring the cold start time of the command line tool.",
+    )
+    parser.add_argument(
+        "--max-startup",
+        type=float,
+        default=None,
+        help="Fail if a small board takes longer than this many seconds to build.",
+    )
+    parser.add_argument("--output", "-o", type=str, default="benchmark.json")
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="Results of an earlier run to compare against.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed slowdown relative to the baseline, e.g. 0.2 for 20%%.",
+    )
+    parsed = parser.parse_args(args)
+
+    results = run_benchmarks(
+        parsed.sizes,
+        parsed.densities,
+        repeat=parsed.repeat,
+        memory=not parsed.no_memory,
+        startup=not parsed.no_startup or parsed.max_startup is not None,
+    )
+    with open(parsed.output, "w") as outf:
+        json.dump(results, outf, indent=2)
+
+    if parsed.max_startup is not None:
+        build_seconds = results["startup"]["build"]
+        if build_seconds > parsed.max_startup:
+            print(
+                f"Startup: building a small board took {build_seconds:.3f}s "
+                f"> {parsed.max_startup:.3f}s",
+                file=sys.stderr,
+            )
+            return 1
+
+    if parsed.baseline:
+        with open(parsed.baseline, "r") as inf:
+            baseline = json.load(inf)
+        regressions = compare(results, baseline, tolerance=parsed.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
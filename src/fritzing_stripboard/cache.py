@@ -0,0 +1,182 @@
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import IO, TYPE_CHECKING, Any, Optional, Union
+
+from . import __version__
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .types import BoardSpecification
+
+
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+
+CACHE_EXTENSION = ".fzpz"
+
+#: Part of every cache key; bumped whenever the archive's contents change
+#: in a way the package version alone would not show, so that archives
+#: cached before the change are not returned.
+ARCHIVE_LAYOUT = 2
+
+#: Fields whose defaults are generated fresh for every validation (a
+#: random UUID or the current time).  Unless they were set explicitly
+#: they are left out of the cache key so that repeat builds of the same
+#: spec can hit; the cached archive keeps the values of the first build.
+VOLATILE_FIELDS = frozenset({"id", "date"})
+
+
+def _normalize(value: Any) -> Any:
+    # Models are recognized by their fields rather than by ``isinstance``
+    # so that importing the cache does not import pydantic.
+    fields = getattr(value, "__fields__", None)
+    if fields is not None and hasattr(value, "__fields_set__"):
+        return {
+            name: _normalize(getattr(value, name))
+            for name in fields
+            if name not in VOLATILE_FIELDS or name in value.__fields_set__
+        }
+    elif isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    elif isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    elif isinstance(value, datetime.datetime):
+        return value.isoformat()
+    elif isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def get_model_key(model: Any) -> str:
+    """Stable hash of a validated model, ignoring unset volatile fields."""
+    normalized = json.dumps(_normalize(model), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def get_cache_key(
+    board: "BoardSpecification", options: Optional[dict[str, Any]] = None
+) -> str:
+    """Hash of the validated specification, build options and version."""
+    key = {"version": __version__, "layout": ARCHIVE_LAYOUT, "board": board}
+    if options:
+        key["options"] = options
+    return get_model_key(key)
+
+
+class BuildCache:
+    """Directory of previously built archives keyed by ``get_cache_key``.
+
+    Entries older than ``max_age`` seconds are discarded, and the least
+    recently used entries are evicted once the directory grows beyond
+    ``max_size`` bytes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_age: float = DEFAULT_MAX_AGE,
+    ):
+        self.path = path
+        self.max_size = max_size
+        self.max_age = max_age
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_entry_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}{CACHE_EXTENSION}")
+
+    def fetch(
+        self,
+        board: "BoardSpecification",
+        output: Union[str, IO[bytes]],
+        options: Optional[dict[str, Any]] = None,
+    ) -> bool:
+        """Copy the cached archive for ``board`` to ``output`` if there is one.
+
+        ``output`` is a path or a binary file object.
+        """
+        entry = self.get_entry_path(get_cache_key(board, options))
+
+        try:
+            if time.time() - os.path.getmtime(entry) > self.max_age:
+                self.misses += 1
+                return False
+            if isinstance(output, str):
+                shutil.copyfile(entry, output)
+            else:
+                with open(entry, "rb") as inf:
+                    shutil.copyfileobj(inf, output)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+
+        os.utime(entry)
+        self.hits += 1
+        return True
+
+    def store(
+        self,
+        board: "BoardSpecification",
+        archive: Union[str, IO[bytes]],
+        options: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """Store ``archive``, a path or a file object read from its position."""
+        os.makedirs(self.path, exist_ok=True)
+
+        fd, temporary_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        os.close(fd)
+        try:
+            if isinstance(archive, str):
+                shutil.copyfile(archive, temporary_path)
+            else:
+                with open(temporary_path, "wb") as outf:
+                    shutil.copyfileobj(archive, outf)
+            os.replace(
+                temporary_path, self.get_entry_path(get_cache_key(board, options))
+            )
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+        self.evict()
+
+    def evict(self) -> None:
+        now = time.time()
+        entries: list[tuple[float, int, str]] = []
+
+        with os.scandir(self.path) as scanner:
+            for entry in scanner:
+                if not entry.name.endswith(CACHE_EXTENSION):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        total_size = sum(size for _, size, _ in entries)
+
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age and total_size <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+            self.evictions += 1
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,18 +1,664 @@
+"""Command line entry points.
+
+Everything beyond argument parsing is imported when a command needs it,
+so that small builds and ``--check`` do not pay for importing pydantic,
+NumPy or the process pool up front.
+"""
 import argparse
+import contextlib
+import json
 import sys
+from typing import TYPE_CHECKING, Any, Optional
+import zipfile
+
+from .cache import DEFAULT_MAX_AGE, DEFAULT_MAX_SIZE, BuildCache
+from .constants import DEFAULT_SVG_PRECISION
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .emitters import SvgFormat
+    from .ir import BoardIR
+    from .types import BoardSpecification
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Reuse previously built archives stored in this directory.",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        default=DEFAULT_MAX_SIZE // (1024 * 1024),
+        help="Evict the least recently used entries beyond this many MiB.",
+    )
+    parser.add_argument(
+        "--cache-max-age",
+        type=float,
+        default=DEFAULT_MAX_AGE / (24 * 60 * 60),
+        help="Evict entries older than this many days.",
+    )
+
+
+def get_cache(args: argparse.Namespace) -> Optional[BuildCache]:
+    if not args.cache_dir:
+        return None
+
+    return BuildCache(
+        args.cache_dir,
+        max_size=args.cache_max_size * 1024 * 1024,
+        max_age=args.cache_max_age * 24 * 60 * 60,
+    )
+
+
+COMPRESSION_METHODS = {
+    "stored": zipfile.ZIP_STORED,
+    "deflated": zipfile.ZIP_DEFLATED,
+}
+
+
+def add_compression_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--compression",
+        choices=sorted(COMPRESSION_METHODS),
+        default="stored",
+        help="How archive entries are stored; deflated is smaller but slower.",
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        default=None,
+        choices=range(10),
+        metavar="0-9",
+        help="Deflate level, from 0 (fastest) to 9 (smallest).",
+    )
+
+
+def get_compression_options(args: argparse.Namespace) -> dict[str, Optional[int]]:
+    return {
+        "compression": COMPRESSION_METHODS[args.compression],
+        "compresslevel": args.compression_level,
+    }
+
+
+def add_svg_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--compact-svg",
+        type=int,
+        nargs="?",
+        const=DEFAULT_SVG_PRECISION,
+        default=None,
+        metavar="DECIMALS",
+        help=(
+            "Share styling between SVG elements through CSS classes and round "
+            f"coordinates to DECIMALS places (default {DEFAULT_SVG_PRECISION})."
+        ),
+    )
+
+
+def get_svg_format(args: argparse.Namespace) -> Optional["SvgFormat"]:
+    if args.compact_svg is None:
+        return None
+
+    from .emitters import SvgFormat
+
+    return SvgFormat(precision=args.compact_svg)
+
+
+def report_svg_savings(
+    svg_format: "SvgFormat", board: "BoardSpecification", output: str
+) -> None:
+    """Report how much smaller the breadboard SVG, the only one compacted, got."""
+    from .zip import get_svg_entry_name
+
+    message = f"Compact SVG: {svg_format.saved_bytes} bytes smaller"
+    if output != "-":
+        with zipfile.ZipFile(output) as archive:
+            svg_size = archive.getinfo(
+                get_svg_entry_name(board, "breadboard")
+            ).file_size
+        full_size = svg_size + svg_format.saved_bytes
+        if full_size:
+            message += (
+                f" ({svg_format.saved_bytes / full_size:.0%} of " f"{full_size} bytes)"
+            )
+    print(message, file=sys.stderr)
+
+
+def add_overlap_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--check-overlaps",
+        action="store_true",
+        help="Report components that cover the same cells.",
+    )
+    parser.add_argument(
+        "--merge-overlaps",
+        action="store_true",
+        help="Emit holes covered by several components only once.",
+    )
+    parser.add_argument(
+        "--merge-nets",
+        action="store_true",
+        help="Join buses that share a cell into a single net.",
+    )
+
+
+def add_export_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--drill",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Also write the board's drilled holes to PATH as an Excellon file.",
+    )
+    parser.add_argument(
+        "--hole-table",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help=(
+            "Also write every hole's position and net to PATH, as JSON if it "
+            "ends in .json and as CSV otherwise."
+        ),
+    )
+
+
+def get_export_holes(args: argparse.Namespace) -> Optional["BoardIR"]:
+    if args.drill is None and args.hole_table is None:
+        return None
+
+    from .ir import BoardIR
+
+    return BoardIR()
+
+
+def write_exports(
+    args: argparse.Namespace, board: "BoardSpecification", holes: "BoardIR"
+) -> None:
+    from .exports import write_excellon, write_hole_table
+
+    if args.drill is not None:
+        with open(args.drill, "w") as outf:
+            write_excellon(board, holes, outf)
+    if args.hole_table is not None:
+        write_hole_table(holes, args.hole_table)
+
+
+def add_tiling_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Report holes emitted, holes per second and the time left on stderr.",
+    )
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        default=None,
+        metavar="HOLES",
+        help=(
+            "Run large drilled_rows and drilled_columns ranges in tiles of at "
+            "most this many holes (default with --progress: 65536)."
+        ),
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=float,
+        default=None,
+        metavar="MB",
+        help=(
+            "With --stream, keep up to this much generated output in memory "
+            "before spilling it to temporary files."
+        ),
+    )
+
+
+def get_tiling_options(args: argparse.Namespace) -> dict[str, Any]:
+    from .tiles import DEFAULT_TILE_SIZE
+
+    options: dict[str, Any] = {"tile_size": args.tile_size}
+    if args.progress:
+        from .progress import Progress
+
+        options["progress"] = Progress()
+        if args.tile_size is None:
+            options["tile_size"] = DEFAULT_TILE_SIZE
+    if args.memory_limit is not None:
+        options["memory_limit"] = int(args.memory_limit * 1024 * 1024)
+    return options
+
 
-import yaml
+def report_overlaps(board: "BoardSpecification") -> None:
+    from .grid import convert_coordinate_to_cell
+    from .occupancy import find_overlaps
 
-from .types import BoardSpecification
-from .zip import build_zip
+    for overlap in find_overlaps(board):
+        print(
+            f"Grid {overlap.grid}: {overlap.first_range} ({overlap.first}) and "
+            f"{overlap.second_range} ({overlap.second}) overlap "
+            f"on {overlap.cells} cell(s), e.g. "
+            f"{convert_coordinate_to_cell(overlap.example)}",
+            file=sys.stderr,
+        )
+
+
+def check_family(data: dict) -> list[str]:
+    from pydantic import ValidationError
+
+    from .family import UnknownParameter, iter_variant_data
+    from .types import BoardFamily
+    from .validation import check_specification
+
+    try:
+        family = BoardFamily.parse_obj(data)
+        variants = list(iter_variant_data(family))
+    except ValidationError as e:
+        return [str(e)]
+    except UnknownParameter as e:
+        return [f"unknown parameter {e}"]
+
+    return [
+        f"variant {label or '-'}: {error}"
+        for label, _, variant_data in variants
+        for error in check_specification(variant_data)
+    ]
+
+
+def build_family_variants(
+    args: argparse.Namespace, data: dict, svg_format: Optional["SvgFormat"]
+) -> None:
+    import os
+
+    from .family import build_family
+    from .types import BoardFamily
+
+    family = BoardFamily.parse_obj(data)
+    name = os.path.splitext(os.path.basename(args.path.name))[0]
+    if args.bundle:
+        destination = {"bundle": args.output}
+    else:
+        destination = {"output_dir": args.output}
+
+    variants = build_family(
+        family,
+        name,
+        stream=args.stream,
+        cache=get_cache(args),
+        merge_overlaps=args.merge_overlaps,
+        merge_nets=args.merge_nets,
+        svg_format=svg_format,
+        workers=args.jobs or None,
+        **destination,
+        **get_tiling_options(args),
+        **get_compression_options(args),
+    )
+    print(f"Built {len(variants)} variants of {name}", file=sys.stderr)
 
 
 def main(args=sys.argv):
     parser = argparse.ArgumentParser(description="Command description.")
     parser.add_argument("path", type=argparse.FileType("r"))
-    parser.add_argument("output", type=str)
+    parser.add_argument(
+        "output",
+        type=str,
+        nargs="?",
+        help=(
+            "Path to write the part archive to, or - for standard output.  "
+            "For a spec with a sweep, the directory to write each variant to."
+        ),
+    )
+    parser.add_argument(
+        "--bundle",
+        action="store_true",
+        help=(
+            "For a spec with a sweep, write every variant's archive into a "
+            "single zip file at the output path."
+        ),
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help=(
+            "Only check the shape of the spec, without building any models "
+            "or writing an archive."
+        ),
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Write elements into the archive as they are generated rather "
+            "than building each document in memory first."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help=(
+            "Build the board's grids in this many worker processes; "
+            "0 uses one per CPU."
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep running and rebuild whenever the spec changes, regenerating "
+            "only the components that changed.  Builds are always streamed; "
+            "merging, exports, profiling, tiling, the cache and --jobs are "
+            "not available."
+        ),
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=None,
+        help="Seconds between checks for changes to the spec.",
+    )
+    add_overlap_arguments(parser)
+    add_export_arguments(parser)
+    add_tiling_arguments(parser)
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help=(
+            "Write a JSON report of phase timings and per-component handler "
+            "timings and element counts to this path."
+        ),
+    )
+    parser.add_argument(
+        "--cprofile",
+        type=str,
+        default=None,
+        help="Write cProfile statistics for the build to this path.",
+    )
+    add_svg_arguments(parser)
+    add_compression_arguments(parser)
+    add_cache_arguments(parser)
     args = parser.parse_args(args=args[1:])
 
-    loaded = BoardSpecification.parse_obj(yaml.safe_load(args.path))
+    from .loader import load_raw_specification
+
+    data = load_raw_specification(args.path)
+
+    if args.check:
+        from .loader import is_compiled
+        from .validation import check_specification
+
+        if is_compiled(data):
+            data = data["spec"]
+        if isinstance(data, dict) and "sweep" in data:
+            errors = check_family(data)
+        else:
+            errors = check_specification(data)
+        for error in errors:
+            print(f"{args.path.name}: {error}", file=sys.stderr)
+        return 1 if errors else 0
+
+    if args.output is None:
+        parser.error("the following arguments are required: output")
+    if args.watch and args.output == "-":
+        parser.error("--watch needs an output path")
+    output = sys.stdout.buffer if args.output == "-" else args.output
+    svg_format = get_svg_format(args)
+    workers = args.jobs or None
+    holes = get_export_holes(args)
+
+    if args.watch:
+        unsupported = [
+            flag
+            for flag, used in (
+                ("--drill and --hole-table", holes is not None),
+                ("--merge-overlaps", args.merge_overlaps),
+                ("--merge-nets", args.merge_nets),
+                ("--jobs", args.jobs != 1),
+                ("--progress", args.progress),
+                ("--tile-size", args.tile_size is not None),
+                ("--memory-limit", args.memory_limit is not None),
+                ("--profile", args.profile),
+                ("--cprofile", args.cprofile),
+                ("--cache-dir", args.cache_dir),
+            )
+            if used
+        ]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} cannot be used with --watch")
+    if args.memory_limit is not None and not args.stream:
+        parser.error("--memory-limit needs --stream")
+    if args.tile_size is not None and args.tile_size < 1:
+        parser.error("--tile-size must be at least 1")
+    if isinstance(data, dict) and "sweep" in data:
+        if args.output == "-" or args.watch or args.profile or args.cprofile:
+            parser.error(
+                "a spec with a sweep needs an output path and cannot be "
+                "watched or profiled"
+            )
+        if holes is not None:
+            parser.error("--drill and --hole-table need a spec without a sweep")
+        return build_family_variants(args, data, svg_format)
+
+    from .loader import parse_specification
+    from .zip import build_zip
+
+    if args.watch:
+        from .watch import watch
+
+        args.path.close()
+        watch_kwargs = {}
+        if args.watch_interval is not None:
+            watch_kwargs["interval"] = args.watch_interval
+        watch(
+            args.path.name,
+            args.output,
+            check=report_overlaps if args.check_overlaps else None,
+            svg_format=svg_format,
+            **watch_kwargs,
+            **get_compression_options(args),
+        )
+        return
+
+    # ``zip`` has imported ``profiling`` already.
+    from .profiling import phase, profile
+
+    profiling = bool(args.profile or args.cprofile)
+    with (
+        profile(cprofile=bool(args.cprofile)) if profiling else contextlib.nullcontext()
+    ) as profiler:
+        with phase("load"):
+            loaded = parse_specification(data)
+        if args.check_overlaps:
+            with phase("check_overlaps"):
+                report_overlaps(loaded)
+        build_zip(
+            loaded,
+            output,
+            stream=args.stream,
+            cache=get_cache(args),
+            merge_overlaps=args.merge_overlaps,
+            merge_nets=args.merge_nets,
+            svg_format=svg_format,
+            workers=workers,
+            holes=holes,
+            **get_tiling_options(args),
+            **get_compression_options(args),
+        )
+        if holes is not None:
+            with phase("exports"):
+                write_exports(args, loaded, holes)
+
+    if svg_format is not None and svg_format.saved_bytes:
+        report_svg_savings(svg_format, loaded, args.output)
+    if args.profile:
+        with open(args.profile, "w") as outf:
+            json.dump(profiler.get_report(), outf, indent=2)
+    if args.cprofile:
+        profiler.dump_cprofile(args.cprofile)
+
+
+def compile_spec(args=sys.argv):
+    parser = argparse.ArgumentParser(
+        description=(
+            "Validate a spec and store it as compact JSON that later builds "
+            "load without validating it again."
+        )
+    )
+    parser.add_argument("path", type=argparse.FileType("r"))
+    parser.add_argument("output", type=argparse.FileType("w"))
+    args = parser.parse_args(args=args[1:])
+
+    from .compiled import dump_compiled
+    from .loader import load_specification
+
+    dump_compiled(load_specification(args.path), args.output)
+
+
+def batch(args=sys.argv):
+    parser = argparse.ArgumentParser(
+        description="Build many board specifications in parallel."
+    )
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        help="Spec files, directories containing specs, or glob patterns.",
+    )
+    parser.add_argument("--manifest", type=str, help="File listing one spec per line.")
+    parser.add_argument("--output-dir", "-o", type=str, default=".")
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help="Number of worker processes; 0, the default, uses one per CPU.",
+    )
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument(
+        "--merge-overlaps",
+        action="store_true",
+        help="Emit holes covered by several components only once.",
+    )
+    parser.add_argument(
+        "--merge-nets",
+        action="store_true",
+        help="Join buses that share a cell into a single net.",
+    )
+    add_svg_arguments(parser)
+    add_compression_arguments(parser)
+    add_cache_arguments(parser)
+    args = parser.parse_args(args=args[1:])
+
+    from .batch import build_batch, collect_specs, read_manifest
+
+    sources = list(args.sources)
+    if args.manifest:
+        sources.extend(read_manifest(args.manifest))
+    paths = collect_specs(sources)
+    if not paths:
+        parser.error("no board specifications found")
+
+    try:
+        summary = build_batch(
+            paths,
+            args.output_dir,
+            workers=args.jobs or None,
+            stream=args.stream,
+            cache=get_cache(args),
+            merge_overlaps=args.merge_overlaps,
+            merge_nets=args.merge_nets,
+            compact_svg=args.compact_svg,
+            **get_compression_options(args),
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    for result in summary.failures:
+        print(f"{result.path}: {result.error}", file=sys.stderr)
+
+    built = len(summary.results) - len(summary.failures)
+    print(
+        f"Built {built} of {len(summary.results)} specs "
+        f"in {summary.duration:.2f}s ({summary.specs_per_second:.1f} specs/s); "
+        f"{len(summary.failures)} failed",
+        file=sys.stderr,
+    )
+    if args.cache_dir:
+        print(
+            f"Cache: {summary.cache_hits} hits, "
+            f"{len(summary.results) - summary.cache_hits} misses",
+            file=sys.stderr,
+        )
+
+    return 1 if summary.failures else 0
+
+
+def server(args=sys.argv):
+    import asyncio
+
+    from .server import (
+        DEFAULT_HOST,
+        DEFAULT_MAX_BODY,
+        DEFAULT_PORT,
+        DEFAULT_QUEUE_SIZE,
+        DEFAULT_TIMEOUT,
+        serve,
+    )
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Serve builds over HTTP: POST a YAML or JSON spec to /build to "
+            "receive the part archive; GET /metrics for request timings."
+        )
+    )
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Listen on this Unix socket instead of a TCP port.",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help="Number of worker processes; defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="Builds allowed to wait for a worker before requests are refused.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Seconds a build may take before the request fails.",
+    )
+    parser.add_argument(
+        "--max-body",
+        type=int,
+        default=DEFAULT_MAX_BODY,
+        help="Largest accepted spec, in bytes.",
+    )
+    add_cache_arguments(parser)
+    args = parser.parse_args(args=args[1:])
 
-    build_zip(loaded, args.output)
+    try:
+        asyncio.run(
+            serve(
+                host=args.host,
+                port=args.port,
+                unix_socket=args.socket,
+                workers=args.jobs,
+                queue_size=args.queue_size,
+                timeout=args.timeout,
+                max_body=args.max_body,
+                cache=get_cache(args),
+            )
+        )
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,95 @@
+"""Validated specs stored so that they can be loaded without validation.
+
+``dump_compiled`` writes a spec's validated values as compact JSON, and
+``construct_specification`` rebuilds the models from them with
+``construct``, skipping pydantic's validation -- for specs with
+thousands of components, by far the slowest part of loading them.
+Only values that were set in the original spec are stored, so defaults
+such as generated ids are still filled in fresh on every load, just as
+for the source spec.
+
+Compiled specs are only trusted when they were written by this version
+of the package; any other is validated again from its stored values.
+"""
+import datetime
+import json
+from typing import IO, Any
+
+from . import __version__
+from .loader import COMPILED_FORMAT, COMPILED_VERSION
+from .types import (
+    BoardMetadata,
+    BoardSpecification,
+    GridDefinition,
+    GridDefinitionData,
+    GridMetadata,
+    SharedBus,
+    XYBus,
+    XYDrilledBus,
+    XYDrilledBusColumns,
+    XYDrilledBusRows,
+)
+
+
+#: The field that identifies each kind of grid component.
+COMPONENT_MODELS = {
+    "drilled": XYDrilledBus,
+    "bus": XYBus,
+    "drilled_rows": XYDrilledBusRows,
+    "drilled_columns": XYDrilledBusColumns,
+    "shared_bus": SharedBus,
+}
+
+
+def dump_compiled(board: BoardSpecification, output: IO[str]) -> None:
+    json.dump(
+        {
+            "format": COMPILED_FORMAT,
+            "version": COMPILED_VERSION,
+            "package": __version__,
+            "spec": json.loads(board.json(exclude_unset=True)),
+        },
+        output,
+        separators=(",", ":"),
+    )
+
+
+def _construct_component(data: dict[str, Any]) -> Any:
+    for name, model in COMPONENT_MODELS.items():
+        if name in data:
+            break
+
+    if model is SharedBus:
+        data = {
+            **data,
+            "shared_bus": [_construct_component(item) for item in data["shared_bus"]],
+        }
+    return model.construct(**data)
+
+
+def _construct_grid(data: dict[str, Any]) -> GridDefinition:
+    grid = dict(data["grid"])
+    if "meta" in grid:
+        meta = dict(grid["meta"])
+        if "origin" in meta:
+            meta["origin"] = tuple(meta["origin"])
+        grid["meta"] = GridMetadata.construct(**meta)
+    if "components" in grid:
+        grid["components"] = [_construct_component(item) for item in grid["components"]]
+    return GridDefinition.construct(grid=GridDefinitionData.construct(**grid))
+
+
+def construct_specification(data: dict[str, Any]) -> BoardSpecification:
+    """Rebuild the models of a spec written by ``dump_compiled``."""
+    spec = data["spec"]
+    if data.get("version") != COMPILED_VERSION or data.get("package") != __version__:
+        return BoardSpecification.parse_obj(spec)
+
+    meta = dict(spec["meta"])
+    if "date" in meta:
+        meta["date"] = datetime.datetime.fromisoformat(meta["date"])
+
+    fields: dict[str, Any] = {"meta": BoardMetadata.construct(**meta)}
+    if "board" in spec:
+        fields["board"] = [_construct_grid(item) for item in spec["board"]]
+    return BoardSpecification.construct(**fields)
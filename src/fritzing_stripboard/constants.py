@@ -1 +1,4 @@
 DEFAULT_PITCH = 2.54
+
+#: Decimal places kept by compact SVG output unless configured otherwise.
+DEFAULT_SVG_PRECISION = 3
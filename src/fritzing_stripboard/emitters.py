@@ -0,0 +1,735 @@
+from collections import deque
+from typing import IO, Any, Callable, NamedTuple, Optional, Protocol
+from xml.etree import ElementTree
+
+
+class BusOrderError(Exception):
+    pass
+
+
+class PartEmitter(Protocol):
+    def add_bus(self, bus_id: str) -> Any:
+        ...
+
+    def add_line(
+        self,
+        line_id: str,
+        start: tuple[float, float],
+        end: tuple[float, float],
+    ) -> None:
+        ...
+
+    def add_hole(
+        self,
+        svg_id: str,
+        connector_id: str,
+        position: tuple[float, float],
+        bus: Any,
+        drilled: bool = True,
+    ) -> None:
+        """Add a hole; a ``bus`` of ``None`` leaves it off every bus."""
+
+    def add_node_member(self, connector_id: str, bus: Any) -> None:
+        ...
+
+
+def line_element(
+    line_id: str, start: tuple[float, float], end: tuple[float, float]
+) -> ElementTree.Element:
+    return ElementTree.Element(
+        "line",
+        attrib={
+            "id": line_id,
+            "x1": f"{start[0]}mm",
+            "y1": f"{start[1]}mm",
+            "x2": f"{end[0]}mm",
+            "y2": f"{end[1]}mm",
+            "stroke": "brown",
+            "stroke-width": "1.5mm",
+            "style": "stroke-linecap:round; stroke-opacity: 0.5;",
+        },
+    )
+
+
+def circle_element(
+    svg_id: str, position: tuple[float, float], drilled: bool
+) -> ElementTree.Element:
+    return ElementTree.Element(
+        "circle",
+        attrib={
+            "id": svg_id,
+            "cx": f"{position[0]}mm",
+            "cy": f"{position[1]}mm",
+            "r": "0.5mm" if drilled else "0.1mm",
+            "stroke-width": "0.35mm" if drilled else "0.1mm",
+            "stroke": "brown",
+            "fill": "none",
+        },
+    )
+
+
+#: Colour of copper in Fritzing's PCB view.
+COPPER_COLOR = "#F7BD13"
+
+
+def pcb_line_element(
+    line_id: str, start: tuple[float, float], end: tuple[float, float]
+) -> ElementTree.Element:
+    return ElementTree.Element(
+        "line",
+        attrib={
+            "id": line_id,
+            "x1": f"{start[0]}mm",
+            "y1": f"{start[1]}mm",
+            "x2": f"{end[0]}mm",
+            "y2": f"{end[1]}mm",
+            "stroke": COPPER_COLOR,
+            "stroke-width": "1.5mm",
+            "stroke-linecap": "round",
+        },
+    )
+
+
+def pcb_circle_element(
+    svg_id: str, position: tuple[float, float], drilled: bool
+) -> ElementTree.Element:
+    return ElementTree.Element(
+        "circle",
+        attrib={
+            "id": svg_id,
+            "cx": f"{position[0]}mm",
+            "cy": f"{position[1]}mm",
+            "r": "0.5mm" if drilled else "0.25mm",
+            "stroke-width": "0.35mm" if drilled else "0",
+            "stroke": COPPER_COLOR,
+            "fill": "none" if drilled else COPPER_COLOR,
+        },
+    )
+
+
+def schematic_line_element(
+    line_id: str, start: tuple[float, float], end: tuple[float, float]
+) -> ElementTree.Element:
+    return ElementTree.Element(
+        "line",
+        attrib={
+            "id": line_id,
+            "x1": f"{start[0]}mm",
+            "y1": f"{start[1]}mm",
+            "x2": f"{end[0]}mm",
+            "y2": f"{end[1]}mm",
+            "stroke": "black",
+            "stroke-width": "0.3mm",
+        },
+    )
+
+
+def schematic_circle_element(
+    svg_id: str, position: tuple[float, float], drilled: bool
+) -> ElementTree.Element:
+    return ElementTree.Element(
+        "circle",
+        attrib={
+            "id": svg_id,
+            "cx": f"{position[0]}mm",
+            "cy": f"{position[1]}mm",
+            "r": "0.4mm" if drilled else "0.2mm",
+            "fill": "black",
+        },
+    )
+
+
+class ViewElements(NamedTuple):
+    line: Callable[[str, tuple[float, float], tuple[float, float]], ElementTree.Element]
+    circle: Callable[[str, tuple[float, float], bool], ElementTree.Element]
+
+
+#: Views drawn alongside the breadboard view from the same traces and
+#: holes.  The breadboard view is built by ``SvgFormat`` instead.
+EXTRA_VIEWS: dict[str, ViewElements] = {
+    "pcb": ViewElements(pcb_line_element, pcb_circle_element),
+    "schematic": ViewElements(schematic_line_element, schematic_circle_element),
+}
+
+
+def connector_element(connector_id: str, drilled: bool) -> ElementTree.Element:
+    connector = ElementTree.Element(
+        "connector",
+        attrib={
+            "type": "female" if drilled else "pad",
+            "name": connector_id,
+            "id": connector_id,
+        },
+    )
+    connector_views = ElementTree.SubElement(connector, "views")
+    connector_breadboard_view = ElementTree.SubElement(
+        connector_views, "breadboardView"
+    )
+    ElementTree.SubElement(
+        connector_breadboard_view,
+        "p",
+        attrib={"layer": "breadboard", "svgId": connector_id},
+    )
+    # Pads sit in the ``copper1`` group nested inside ``copper0``, so one
+    # element serves both layers.
+    connector_pcb_view = ElementTree.SubElement(connector_views, "pcbView")
+    for layer in ("copper0", "copper1"):
+        ElementTree.SubElement(
+            connector_pcb_view, "p", attrib={"layer": layer, "svgId": connector_id}
+        )
+    connector_schematic_view = ElementTree.SubElement(connector_views, "schematicView")
+    ElementTree.SubElement(
+        connector_schematic_view,
+        "p",
+        attrib={"layer": "schematic", "svgId": connector_id},
+    )
+    return connector
+
+
+def node_member_element(connector_id: str) -> ElementTree.Element:
+    return ElementTree.Element("nodeMember", attrib={"connectorId": connector_id})
+
+
+#: Styling shared by every trace and hole in compact SVG output.
+COMPACT_SVG_STYLE = (
+    ".trace{stroke:brown;stroke-width:1.5mm;"
+    "stroke-linecap:round;stroke-opacity:0.5}"
+    ".hole{stroke:brown;stroke-width:0.35mm;fill:none}"
+    ".pad{stroke:brown;stroke-width:0.1mm;fill:none}"
+)
+
+
+def format_number(value: float, precision: int) -> str:
+    """Round ``value`` to ``precision`` decimals, dropping trailing zeros.
+
+    >>> format_number(3.8100000000000005, 3)
+    '3.81'
+    >>> format_number(-0.0001, 3)
+    '0'
+    >>> format_number(20.0, 0)
+    '20'
+    """
+    text = f"{value:.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+class SvgFormat:
+    """Builds the trace and hole elements of the breadboard SVG.
+
+    With ``precision`` unset, elements carry their full styling and
+    exact coordinates, as ``line_element`` and ``circle_element`` write
+    them.  Otherwise styling moves into a shared ``<style>`` block
+    referenced by class, and coordinates are rounded to ``precision``
+    decimal places; ids are unchanged.  ``saved_bytes`` counts how much
+    smaller the serialized SVG is than it would have been in full.
+    """
+
+    def __init__(self, precision: Optional[int] = None):
+        self.precision = precision
+        self.saved_bytes = 0
+        self._line_saving = self._hole_saving = self._pad_saving = 0
+
+        if precision is not None:
+            self._line_saving = self._get_saving(
+                line_element("", (0.0, 0.0), (0.0, 0.0)),
+                self.line("", (0.0, 0.0), (0.0, 0.0)),
+                4,
+            )
+            self._hole_saving = self._get_saving(
+                circle_element("", (0.0, 0.0), True),
+                self.circle("", (0.0, 0.0), True),
+                2,
+            )
+            self._pad_saving = self._get_saving(
+                circle_element("", (0.0, 0.0), False),
+                self.circle("", (0.0, 0.0), False),
+                2,
+            )
+            self.saved_bytes = 0
+
+    @property
+    def compact(self) -> bool:
+        return self.precision is not None
+
+    def _get_saving(
+        self, full: ElementTree.Element, compact: ElementTree.Element, numbers: int
+    ) -> int:
+        # Bytes saved on everything but the coordinates, which ``_count``
+        # adds for each element.
+        difference = len(ElementTree.tostring(full)) - len(
+            ElementTree.tostring(compact)
+        )
+        return difference - numbers * (len("0.0") - len("0"))
+
+    def _number(self, value: float) -> str:
+        text = format_number(value, self.precision)
+        self.saved_bytes += len(repr(value)) - len(text)
+        return f"{text}mm"
+
+    def get_style_element(self) -> Optional[ElementTree.Element]:
+        if not self.compact:
+            return None
+        self.saved_bytes -= len(f"<style>{COMPACT_SVG_STYLE}</style>")
+        style = ElementTree.Element("style")
+        style.text = COMPACT_SVG_STYLE
+        return style
+
+    def line(
+        self, line_id: str, start: tuple[float, float], end: tuple[float, float]
+    ) -> ElementTree.Element:
+        if not self.compact:
+            return line_element(line_id, start, end)
+
+        self.saved_bytes += self._line_saving
+        return ElementTree.Element(
+            "line",
+            attrib={
+                "id": line_id,
+                "class": "trace",
+                "x1": self._number(start[0]),
+                "y1": self._number(start[1]),
+                "x2": self._number(end[0]),
+                "y2": self._number(end[1]),
+            },
+        )
+
+    def circle(
+        self, svg_id: str, position: tuple[float, float], drilled: bool
+    ) -> ElementTree.Element:
+        if not self.compact:
+            return circle_element(svg_id, position, drilled)
+
+        self.saved_bytes += self._hole_saving if drilled else self._pad_saving
+        return ElementTree.Element(
+            "circle",
+            attrib={
+                "id": svg_id,
+                "class": "hole" if drilled else "pad",
+                "cx": self._number(position[0]),
+                "cy": self._number(position[1]),
+                "r": "0.5mm" if drilled else "0.1mm",
+            },
+        )
+
+
+def open_tag(element: ElementTree.Element) -> bytes:
+    """Serialize ``element``'s start tag exactly as ``ElementTree`` would."""
+    empty = ElementTree.Element(element.tag, attrib=element.attrib)
+    return ElementTree.tostring(empty)[: -len(b" />")] + b">"
+
+
+def close_tag(element: ElementTree.Element) -> bytes:
+    return f"</{element.tag}>".encode("ascii")
+
+
+class TreeEmitter:
+    """Appends everything to in-memory ``ElementTree`` elements.
+
+    Traces and holes go to the breadboard ``svg_element`` and to the
+    element of each of ``EXTRA_VIEWS`` given in ``view_elements``.
+    """
+
+    def __init__(
+        self,
+        svg_element: ElementTree.Element,
+        connectors_element: ElementTree.Element,
+        buses_element: ElementTree.Element,
+        svg_format: Optional[SvgFormat] = None,
+        view_elements: Optional[dict[str, ElementTree.Element]] = None,
+    ):
+        self.svg_element = svg_element
+        self.connectors_element = connectors_element
+        self.buses_element = buses_element
+        self.svg_format = svg_format or SvgFormat()
+        self.view_elements = view_elements or {}
+        self._views = [
+            (element, EXTRA_VIEWS[view]) for view, element in self.view_elements.items()
+        ]
+
+    def add_bus(self, bus_id: str) -> ElementTree.Element:
+        return ElementTree.SubElement(self.buses_element, "bus", attrib={"id": bus_id})
+
+    def add_line(
+        self,
+        line_id: str,
+        start: tuple[float, float],
+        end: tuple[float, float],
+    ) -> None:
+        self.svg_element.append(self.svg_format.line(line_id, start, end))
+        for element, builders in self._views:
+            element.append(builders.line(line_id, start, end))
+
+    def add_hole(
+        self,
+        svg_id: str,
+        connector_id: str,
+        position: tuple[float, float],
+        bus: Optional[ElementTree.Element],
+        drilled: bool = True,
+    ) -> None:
+        self.svg_element.append(self.svg_format.circle(svg_id, position, drilled))
+        for element, builders in self._views:
+            element.append(builders.circle(svg_id, position, drilled))
+        if bus is not None:
+            bus.append(node_member_element(connector_id))
+        self.connectors_element.append(connector_element(connector_id, drilled))
+
+    def add_node_member(self, connector_id: str, bus: ElementTree.Element) -> None:
+        bus.append(node_member_element(connector_id))
+
+
+class _StreamBus:
+    __slots__ = ("id", "started", "closed")
+
+    def __init__(self, bus_id: str):
+        self.id = bus_id
+        self.started = False
+        self.closed = False
+
+
+class StreamEmitter:
+    """Serializes every element as soon as a handler produces it.
+
+    Connectors, SVG elements and buses are written to three separate
+    binary streams so that they can later be stitched into their
+    documents.  Bus members must arrive in bus creation order -- once a
+    member has been written for a later bus, earlier buses are closed.
+    Each of ``EXTRA_VIEWS`` given in ``view_files`` gets the traces and
+    holes of its own SVG.
+    """
+
+    def __init__(
+        self,
+        svg_file: IO[bytes],
+        connectors_file: IO[bytes],
+        buses_file: IO[bytes],
+        svg_format: Optional[SvgFormat] = None,
+        view_files: Optional[dict[str, IO[bytes]]] = None,
+    ):
+        self.svg_file = svg_file
+        self.connectors_file = connectors_file
+        self.buses_file = buses_file
+        self.svg_format = svg_format or SvgFormat()
+        self.view_files = view_files or {}
+        self._views = [
+            (view_file, EXTRA_VIEWS[view])
+            for view, view_file in self.view_files.items()
+        ]
+
+        self.connector_count = 0
+        self.bus_count = 0
+        self._pending_buses: deque[_StreamBus] = deque()
+
+    def add_bus(self, bus_id: str) -> _StreamBus:
+        bus = _StreamBus(bus_id)
+        self._pending_buses.append(bus)
+        self.bus_count += 1
+        return bus
+
+    def add_line(
+        self,
+        line_id: str,
+        start: tuple[float, float],
+        end: tuple[float, float],
+    ) -> None:
+        self.svg_file.write(
+            ElementTree.tostring(self.svg_format.line(line_id, start, end))
+        )
+        for view_file, builders in self._views:
+            view_file.write(ElementTree.tostring(builders.line(line_id, start, end)))
+
+    def add_hole(
+        self,
+        svg_id: str,
+        connector_id: str,
+        position: tuple[float, float],
+        bus: Optional[_StreamBus],
+        drilled: bool = True,
+    ) -> None:
+        self.svg_file.write(
+            ElementTree.tostring(self.svg_format.circle(svg_id, position, drilled))
+        )
+        for view_file, builders in self._views:
+            view_file.write(
+                ElementTree.tostring(builders.circle(svg_id, position, drilled))
+            )
+        if bus is not None:
+            self.add_node_member(connector_id, bus)
+        self.connectors_file.write(
+            ElementTree.tostring(connector_element(connector_id, drilled))
+        )
+        self.connector_count += 1
+
+    def add_node_member(self, connector_id: str, bus: _StreamBus) -> None:
+        if bus.closed:
+            raise BusOrderError(bus.id)
+
+        while self._pending_buses[0] is not bus:
+            self._close_bus(self._pending_buses.popleft())
+
+        if not bus.started:
+            self.buses_file.write(
+                open_tag(ElementTree.Element("bus", attrib={"id": bus.id}))
+            )
+            bus.started = True
+
+        self.buses_file.write(ElementTree.tostring(node_member_element(connector_id)))
+
+    def _close_bus(self, bus: _StreamBus) -> None:
+        if bus.started:
+            self.buses_file.write(b"</bus>")
+        else:
+            self.buses_file.write(
+                ElementTree.tostring(ElementTree.Element("bus", attrib={"id": bus.id}))
+            )
+        bus.closed = True
+
+    def close(self) -> None:
+        while self._pending_buses:
+            self._close_bus(self._pending_buses.popleft())
+
+
+def _get_attribute_escapes() -> dict[int, str]:
+    # Ask ElementTree how it escapes each special character so that
+    # templates match it exactly on every Python version.
+    escapes = {}
+    for character in '&<>"\r\n\t':
+        serialized = ElementTree.tostring(ElementTree.Element("a", b=character))
+        escaped = serialized.decode("ascii").split('"')[1]
+        if escaped != character:
+            escapes[ord(character)] = escaped
+    return escapes
+
+
+_ATTRIBUTE_ESCAPES = _get_attribute_escapes()
+
+
+def escape_attribute(value: str) -> str:
+    """Escape ``value`` for an attribute exactly as ``ElementTree`` does.
+
+    >>> escape_attribute('a&b "c" <d>')
+    'a&amp;b &quot;c&quot; &lt;d&gt;'
+    """
+    return value.translate(_ATTRIBUTE_ESCAPES)
+
+
+def _get_template(element: ElementTree.Element) -> str:
+    return ElementTree.tostring(element).decode("ascii")
+
+
+class TemplateEmitter(StreamEmitter):
+    """A ``StreamEmitter`` that formats per-hole markup from string templates.
+
+    The templates are produced by serializing the usual elements with
+    placeholders, so output is byte-identical to ``StreamEmitter`` (and
+    to serializing a ``TreeEmitter``'s documents) without building an
+    element for every hole.  Compact SVG elements are still built by
+    ``SvgFormat``.
+
+    >>> import io
+    >>> tree = TreeEmitter(
+    ...     *(ElementTree.Element(tag) for tag in "abc"),
+    ...     view_elements={view: ElementTree.Element(view) for view in EXTRA_VIEWS},
+    ... )
+    >>> files = [io.BytesIO() for _ in range(3)]
+    >>> view_files = {view: io.BytesIO() for view in EXTRA_VIEWS}
+    >>> template = TemplateEmitter(*files, view_files=view_files)
+    >>> for emitter in (tree, template):
+    ...     bus = emitter.add_bus("bus <1>")
+    ...     emitter.add_line("trace", (0.5, 1.0), (2.25, 1.0))
+    ...     emitter.add_hole('h"1', "h&1", (0.5, 1.0), bus)
+    ...     emitter.add_hole("h\u00e92", "h\u00e92", (2.25, 1.0), bus, drilled=False)
+    >>> template.close()
+    >>> [
+    ...     b"".join(ElementTree.tostring(child) for child in element)
+    ...     for element in (tree.svg_element, tree.connectors_element,
+    ...                     tree.buses_element)
+    ... ] == [f.getvalue() for f in files]
+    True
+    >>> all(
+    ...     b"".join(ElementTree.tostring(child) for child in element)
+    ...     == view_files[view].getvalue()
+    ...     for view, element in tree.view_elements.items()
+    ... )
+    True
+    """
+
+    LINE_TEMPLATE = _get_template(
+        line_element("{line_id}", ("{x1}", "{y1}"), ("{x2}", "{y2}"))
+    )
+    CIRCLE_TEMPLATES = {
+        drilled: _get_template(circle_element("{svg_id}", ("{x}", "{y}"), drilled))
+        for drilled in (True, False)
+    }
+    CONNECTOR_TEMPLATES = {
+        drilled: _get_template(connector_element("{connector_id}", drilled))
+        for drilled in (True, False)
+    }
+    VIEW_TEMPLATES = {
+        view: (
+            _get_template(
+                builders.line("{line_id}", ("{x1}", "{y1}"), ("{x2}", "{y2}"))
+            ),
+            {
+                drilled: _get_template(
+                    builders.circle("{svg_id}", ("{x}", "{y}"), drilled)
+                )
+                for drilled in (True, False)
+            },
+        )
+        for view, builders in EXTRA_VIEWS.items()
+    }
+    NODE_MEMBER_TEMPLATE = _get_template(node_member_element("{connector_id}"))
+    BUS_OPEN_TEMPLATE = open_tag(ElementTree.Element("bus", id="{bus_id}")).decode(
+        "ascii"
+    )
+    EMPTY_BUS_TEMPLATE = _get_template(ElementTree.Element("bus", id="{bus_id}"))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._view_templates = [
+            (view_file, *self.VIEW_TEMPLATES[view])
+            for view, view_file in self.view_files.items()
+        ]
+
+    def add_line(
+        self,
+        line_id: str,
+        start: tuple[float, float],
+        end: tuple[float, float],
+    ) -> None:
+        escaped_id = escape_attribute(line_id)
+        if self.svg_format.compact:
+            self.svg_file.write(
+                ElementTree.tostring(self.svg_format.line(line_id, start, end))
+            )
+        else:
+            self.svg_file.write(
+                self.LINE_TEMPLATE.format(
+                    line_id=escaped_id, x1=start[0], y1=start[1], x2=end[0], y2=end[1]
+                ).encode("ascii", "xmlcharrefreplace")
+            )
+
+        for view_file, line_template, _ in self._view_templates:
+            view_file.write(
+                line_template.format(
+                    line_id=escaped_id, x1=start[0], y1=start[1], x2=end[0], y2=end[1]
+                ).encode("ascii", "xmlcharrefreplace")
+            )
+
+    def add_hole(
+        self,
+        svg_id: str,
+        connector_id: str,
+        position: tuple[float, float],
+        bus: Optional[_StreamBus],
+        drilled: bool = True,
+    ) -> None:
+        escaped_svg_id = escape_attribute(svg_id)
+        if self.svg_format.compact:
+            self.svg_file.write(
+                ElementTree.tostring(self.svg_format.circle(svg_id, position, drilled))
+            )
+        else:
+            self.svg_file.write(
+                self.CIRCLE_TEMPLATES[drilled]
+                .format(svg_id=escaped_svg_id, x=position[0], y=position[1])
+                .encode("ascii", "xmlcharrefreplace")
+            )
+
+        for view_file, _, circle_templates in self._view_templates:
+            view_file.write(
+                circle_templates[drilled]
+                .format(svg_id=escaped_svg_id, x=position[0], y=position[1])
+                .encode("ascii", "xmlcharrefreplace")
+            )
+
+        escaped_id = escape_attribute(connector_id)
+        if bus is not None:
+            self._add_escaped_node_member(escaped_id, bus)
+        self.connectors_file.write(
+            self.CONNECTOR_TEMPLATES[drilled]
+            .format(connector_id=escaped_id)
+            .encode("ascii", "xmlcharrefreplace")
+        )
+        self.connector_count += 1
+
+    def add_node_member(self, connector_id: str, bus: _StreamBus) -> None:
+        self._add_escaped_node_member(escape_attribute(connector_id), bus)
+
+    def _add_escaped_node_member(self, escaped_id: str, bus: _StreamBus) -> None:
+        if bus.closed:
+            raise BusOrderError(bus.id)
+
+        while self._pending_buses[0] is not bus:
+            self._close_bus(self._pending_buses.popleft())
+
+        if not bus.started:
+            self.buses_file.write(
+                self.BUS_OPEN_TEMPLATE.format(bus_id=escape_attribute(bus.id)).encode(
+                    "ascii", "xmlcharrefreplace"
+                )
+            )
+            bus.started = True
+
+        self.buses_file.write(
+            self.NODE_MEMBER_TEMPLATE.format(connector_id=escaped_id).encode(
+                "ascii", "xmlcharrefreplace"
+            )
+        )
+
+    def _close_bus(self, bus: _StreamBus) -> None:
+        if bus.started:
+            self.buses_file.write(b"</bus>")
+        else:
+            self.buses_file.write(
+                self.EMPTY_BUS_TEMPLATE.format(bus_id=escape_attribute(bus.id)).encode(
+                    "ascii", "xmlcharrefreplace"
+                )
+            )
+        bus.closed = True
+
+
+class TeeEmitter:
+    """Forwards everything it is given to each of ``emitters`` in turn.
+
+    Its buses are tuples holding the bus each emitter returned.
+    """
+
+    def __init__(self, *emitters: PartEmitter):
+        self.emitters = emitters
+
+    def add_bus(self, bus_id: str) -> tuple[Any, ...]:
+        return tuple(emitter.add_bus(bus_id) for emitter in self.emitters)
+
+    def add_line(
+        self,
+        line_id: str,
+        start: tuple[float, float],
+        end: tuple[float, float],
+    ) -> None:
+        for emitter in self.emitters:
+            emitter.add_line(line_id, start, end)
+
+    def add_hole(
+        self,
+        svg_id: str,
+        connector_id: str,
+        position: tuple[float, float],
+        bus: Optional[tuple[Any, ...]],
+        drilled: bool = True,
+    ) -> None:
+        for index, emitter in enumerate(self.emitters):
+            emitter.add_hole(
+                svg_id,
+                connector_id,
+                position,
+                None if bus is None else bus[index],
+                drilled=drilled,
+            )
+
+    def add_node_member(self, connector_id: str, bus: tuple[Any, ...]) -> None:
+        for emitter, emitter_bus in zip(self.emitters, bus):
+            emitter.add_node_member(connector_id, emitter_bus)
@@ -0,0 +1,166 @@
+"""Hole data written alongside the part archive for fabrication.
+
+``build_zip(..., holes=BoardIR())`` records every hole of the build as
+it is emitted, so the writers below reuse the positions computed for
+the archive rather than deriving them again; any number of them can be
+written from the one record.  Holes are recorded before any merging,
+each on the bus of the component that placed it, and are identified by
+their SVG id, which unlike the connector id is unique within the part.
+Positions are in millimetres, measured from the board's top-left corner
+like the SVG views, except in the Excellon file, whose Y axis points up
+from the bottom-left corner.
+"""
+import csv
+import json
+from typing import IO
+
+from .ir import HOLE_DRILLED, NO_BUS, BoardIR
+from .nets import DisjointSet
+from .types import BoardSpecification
+
+
+#: Diameter of the drill written to the Excellon file, in millimetres;
+#: that of the holes drawn in the breadboard view.
+DEFAULT_DRILL_DIAMETER = 1.0
+
+#: Decimal places of the coordinates in every export.
+EXPORT_PRECISION = 3
+
+HOLE_TABLE_FIELDS = ("hole", "x", "y", "drilled", "net")
+
+
+def get_hole_nets(holes: BoardIR) -> list[str]:
+    """The id of the net each hole of ``holes`` is on, or ``""`` for none.
+
+    Holes placed at the same position are one hole on the board, so
+    their buses form one net, named after the first of them; as do buses
+    joined by ``add_node_member``, whose connector id is resolved to the
+    first hole with that id.
+
+    >>> holes = BoardIR()
+    >>> power, ground = holes.add_bus("power"), holes.add_bus("ground")
+    >>> holes.add_hole("power-0", "power-0", (0.0, 0.0), power)
+    >>> holes.add_hole("ground-0", "ground-0", (2.54, 0.0), ground)
+    >>> holes.add_hole("ground-1", "ground-1", (0.0, 0.0), ground)
+    >>> holes.add_hole("free", "free", (5.08, 0.0), None)
+    >>> get_hole_nets(holes)
+    ['power', 'power', 'power', '']
+    """
+    buses = DisjointSet(holes.bus_count)
+    position_buses: dict[tuple[float, float], int] = {}
+    connector_buses: dict[str, int] = {}
+
+    for connector_id, x, y, bus in zip(
+        holes.hole_connector_ids, holes.hole_x, holes.hole_y, holes.hole_bus
+    ):
+        if bus == NO_BUS:
+            continue
+        buses.union(position_buses.setdefault((x, y), bus), bus)
+        connector_buses.setdefault(connector_id, bus)
+    for connector_id, bus in zip(holes.member_connector_ids, holes.member_bus):
+        buses.union(connector_buses.setdefault(connector_id, bus), bus)
+
+    nets = []
+    for x, y in zip(holes.hole_x, holes.hole_y):
+        bus = position_buses.get((x, y))
+        nets.append("" if bus is None else holes.bus_ids[buses.get_first(bus)])
+    return nets
+
+
+def _format_coordinate(value: float) -> str:
+    return f"{value:.{EXPORT_PRECISION}f}"
+
+
+def write_excellon(
+    board: BoardSpecification,
+    holes: BoardIR,
+    output: IO[str],
+    drill_diameter: float = DEFAULT_DRILL_DIAMETER,
+) -> int:
+    """Write the drilled holes of ``holes`` as an Excellon drill file.
+
+    Pads are not drilled and are left out, and holes placed at the same
+    position are written once.  Returns the number of holes written.
+    """
+    output.write("M48\n")
+    output.write(f"; {board.meta.title} ({board.meta.id})\n")
+    output.write("METRIC,TZ\n")
+    output.write(f"T1C{_format_coordinate(drill_diameter)}\n")
+    output.write("%\nG90\nG05\nT1\n")
+
+    height = board.meta.height
+    drilled = {
+        (x, y): None
+        for x, y, kind in zip(holes.hole_x, holes.hole_y, holes.hole_kind)
+        if kind == HOLE_DRILLED
+    }
+    for x, y in drilled:
+        output.write(f"X{_format_coordinate(x)}Y{_format_coordinate(height - y)}\n")
+
+    output.write("T0\nM30\n")
+    return len(drilled)
+
+
+def write_hole_csv(holes: BoardIR, output: IO[str]) -> None:
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(HOLE_TABLE_FIELDS)
+    for svg_id, x, y, kind, net in zip(
+        holes.hole_svg_ids,
+        holes.hole_x,
+        holes.hole_y,
+        holes.hole_kind,
+        get_hole_nets(holes),
+    ):
+        writer.writerow(
+            (
+                svg_id,
+                _format_coordinate(x),
+                _format_coordinate(y),
+                int(kind == HOLE_DRILLED),
+                net,
+            )
+        )
+
+
+def write_hole_json(holes: BoardIR, output: IO[str]) -> None:
+    """Write every hole, and the holes of every net, as JSON."""
+    hole_nets = get_hole_nets(holes)
+    nets: dict[str, list[str]] = {}
+    for svg_id, net in zip(holes.hole_svg_ids, hole_nets):
+        if net:
+            nets.setdefault(net, []).append(svg_id)
+
+    # ``dumps`` uses the C encoder, which ``dump`` never does.
+    output.write(
+        json.dumps(
+            {
+                "holes": [
+                    {
+                        "hole": svg_id,
+                        "x": round(x, EXPORT_PRECISION),
+                        "y": round(y, EXPORT_PRECISION),
+                        "drilled": kind == HOLE_DRILLED,
+                        "net": net,
+                    }
+                    for svg_id, x, y, kind, net in zip(
+                        holes.hole_svg_ids,
+                        holes.hole_x,
+                        holes.hole_y,
+                        holes.hole_kind,
+                        hole_nets,
+                    )
+                ],
+                "nets": nets,
+            },
+            separators=(",", ":"),
+        )
+    )
+
+
+def write_hole_table(holes: BoardIR, path: str) -> None:
+    """Write ``holes`` to ``path`` as JSON if it ends in ``.json``, else CSV."""
+    with open(path, "w", newline="") as outf:
+        if path.lower().endswith(".json"):
+            write_hole_json(holes, outf)
+        else:
+            write_hole_csv(holes, outf)
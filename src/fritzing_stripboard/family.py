@@ -0,0 +1,147 @@
+import itertools
+import os
+import re
+from typing import Any, Iterator, NamedTuple, Optional
+import zipfile
+
+from .types import BoardFamily, BoardSpecification, ParameterValue
+from .zip import build_zip, build_zip_bytes
+
+
+PLACEHOLDER_PATTERN = re.compile(r"\$\{(\w+)\}")
+
+
+class UnknownParameter(Exception):
+    pass
+
+
+class Variant(NamedTuple):
+    label: str
+    parameters: dict[str, ParameterValue]
+    board: BoardSpecification
+
+
+def substitute_parameters(value: Any, parameters: dict[str, ParameterValue]) -> Any:
+    """Replace every ``${name}`` in ``value`` with its parameter.
+
+    A string consisting of a single placeholder takes the parameter's
+    own type, so that numbers stay numbers.
+
+    >>> substitute_parameters({"pitch": "${pitch}", "bus": "A1:T${rows}"},
+    ...                       {"pitch": 2.54, "rows": 20})
+    {'pitch': 2.54, 'bus': 'A1:T20'}
+    """
+
+    def get_parameter(name: str) -> ParameterValue:
+        try:
+            return parameters[name]
+        except KeyError:
+            raise UnknownParameter(name) from None
+
+    if isinstance(value, str):
+        match = PLACEHOLDER_PATTERN.fullmatch(value)
+        if match:
+            return get_parameter(match.group(1))
+        return PLACEHOLDER_PATTERN.sub(
+            lambda match: str(get_parameter(match.group(1))), value
+        )
+    elif isinstance(value, dict):
+        return {
+            key: substitute_parameters(item, parameters) for key, item in value.items()
+        }
+    elif isinstance(value, list):
+        return [substitute_parameters(item, parameters) for item in value]
+    return value
+
+
+def get_variant_label(parameters: dict[str, ParameterValue]) -> str:
+    """
+    >>> get_variant_label({"rows": 20, "pitch": 2.54})
+    'rows20-pitch2.54'
+    """
+    return "-".join(f"{name}{value}" for name, value in parameters.items())
+
+
+def iter_variant_data(
+    family: BoardFamily,
+) -> Iterator[tuple[str, dict[str, ParameterValue], dict[str, Any]]]:
+    """Yield the label, parameters and raw specification of each variant.
+
+    Every combination of the sweep's parameter lists is combined with
+    each of its ``variants`` in turn.
+    """
+    names = list(family.sweep.parameters)
+    combinations = list(itertools.product(*family.sweep.parameters.values()))
+
+    for combination, overrides in itertools.product(
+        combinations, family.sweep.variants or [{}]
+    ):
+        parameters = {**dict(zip(names, combination)), **overrides}
+        yield get_variant_label(parameters), parameters, {
+            "meta": substitute_parameters(family.meta, parameters),
+            "board": substitute_parameters(family.board, parameters),
+        }
+
+
+def expand_family(family: BoardFamily) -> list[Variant]:
+    """Validate one ``BoardSpecification`` for every variant of ``family``.
+
+    Module ids are suffixed with the variant's label whenever the
+    template would otherwise give two variants the same id.
+    """
+    variants = []
+    seen_ids: set[str] = set()
+
+    for label, parameters, data in iter_variant_data(family):
+        board = BoardSpecification.parse_obj(data)
+        if board.meta.id in seen_ids and label:
+            board.meta.id = f"{board.meta.id}-{label}"
+        seen_ids.add(board.meta.id)
+        variants.append(Variant(label=label, parameters=parameters, board=board))
+
+    return variants
+
+
+def get_variant_filename(name: str, variant: Variant) -> str:
+    if not variant.label:
+        return f"{name}.fzpz"
+    return f"{name}-{variant.label}.fzpz"
+
+
+def build_family(
+    family: BoardFamily,
+    name: str,
+    output_dir: Optional[str] = None,
+    bundle: Optional[str] = None,
+    **kwargs,
+) -> list[Variant]:
+    """Build every variant of ``family`` in this process.
+
+    Each variant is written to ``output_dir`` as its own archive named
+    after ``name`` and its label, or, with ``bundle``, stored in a single
+    zip file under the same names.  ``kwargs`` are passed to
+    ``build_zip``.  Variants share parsed cell ranges and computed hole
+    positions through the caches in ``grid``.
+    """
+    if (output_dir is None) == (bundle is None):
+        raise ValueError("Exactly one of output_dir and bundle is required")
+
+    variants = expand_family(family)
+
+    if bundle is not None:
+        with zipfile.ZipFile(bundle, mode="w") as archive:
+            for variant in variants:
+                archive.writestr(
+                    get_variant_filename(name, variant),
+                    build_zip_bytes(variant.board, **kwargs),
+                )
+        return variants
+
+    os.makedirs(output_dir, exist_ok=True)
+    for variant in variants:
+        build_zip(
+            variant.board,
+            os.path.join(output_dir, get_variant_filename(name, variant)),
+            **kwargs,
+        )
+    return variants
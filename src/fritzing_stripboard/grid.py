@@ -1,7 +1,28 @@
+import functools
 import re
-from typing import Iterable
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, NamedTuple, Optional, Type
 
-from .types import GridMetadata
+from pydantic import BaseModel
+
+from .types import (
+    GridMetadata,
+    SharedBus,
+    XYBus,
+    XYDrilledBus,
+    XYDrilledBusColumns,
+    XYDrilledBusRows,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .model import GridGeometry
+
+#: Ranges with fewer cells than this are computed in pure Python, which
+#: is faster for them and avoids importing NumPy for small boards.
+NUMPY_MIN_CELLS = 256
+
+#: Number of distinct axis ranges whose positions are kept.
+AXIS_CACHE_SIZE = 1024
 
 
 class InvalidCellRange(Exception):
@@ -12,8 +33,64 @@ class InvalidCell(Exception):
     pass
 
 
+@functools.lru_cache(maxsize=None)
+def get_numpy() -> Optional[ModuleType]:
+    """Import NumPy on first use; ``None`` if it is not installed."""
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        return None
+    return numpy
+
+
+CELL_PATTERN = re.compile(r"([A-Z]+)(\d+)")
+
+
+RANGE_FIELDS: dict[Type[BaseModel], str] = {
+    XYDrilledBus: "drilled",
+    XYBus: "bus",
+    XYDrilledBusRows: "drilled_rows",
+    XYDrilledBusColumns: "drilled_columns",
+}
+
+
+class CellRange(NamedTuple):
+    start_x: int
+    start_y: int
+    end_x: int
+    end_y: int
+
+
+RangeTable = dict[str, CellRange]
+
+
+def walk_components(components: Iterable[Any]) -> Iterator[Any]:
+    """Yield every component, descending into ``shared_bus`` groups."""
+    for component in components:
+        yield component
+        if isinstance(component, SharedBus):
+            yield from walk_components(component.shared_bus)
+
+
+def get_cell_range_string(component: Any) -> Optional[str]:
+    field = RANGE_FIELDS.get(type(component))
+    if field is None:
+        return None
+    return getattr(component, field)
+
+
+@functools.lru_cache(maxsize=None)
 def convert_cell_to_coordinate(cell: str) -> tuple[int, int]:
-    position_parts_match = re.compile(r"([A-Z]+)(\d+)").match(cell)
+    """Convert a spreadsheet-style cell into zero-based column and row.
+
+    Columns are read as bijective base-26, so ``Z`` is followed by ``AA``.
+
+    >>> convert_cell_to_coordinate("B3")
+    (1, 3)
+    >>> convert_cell_to_coordinate("AA1")
+    (26, 1)
+    """
+    position_parts_match = CELL_PATTERN.match(cell)
     if not position_parts_match:
         raise InvalidCell(cell)
     letters, numbers = position_parts_match.groups()
@@ -21,14 +98,44 @@ def convert_cell_to_coordinate(cell: str) -> tuple[int, int]:
     y = int(numbers)
     x = 0
     for letter in letters:
-        x += ord(letter) - ord("A")
+        x = x * 26 + ord(letter) - ord("A") + 1
+
+    return x - 1, y
+
 
-    return x, y
+def convert_coordinate_to_cell(coordinate: tuple[int, int]) -> str:
+    """
+    >>> convert_coordinate_to_cell((27, 4))
+    'AB4'
+    """
+    x, y = coordinate
+    letters = ""
+    x += 1
+    while x:
+        x, remainder = divmod(x - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+
+    return f"{letters}{y}"
+
+
+@functools.lru_cache(maxsize=None)
+def parse_cell_range(cell_range: str) -> CellRange:
+    """
+    >>> parse_cell_range("A1:AB3")
+    CellRange(start_x=0, start_y=1, end_x=27, end_y=3)
+    """
+    try:
+        start, end = cell_range.split(":")
+        return CellRange(
+            *convert_cell_to_coordinate(start), *convert_cell_to_coordinate(end)
+        )
+    except (ValueError, InvalidCell) as exc:
+        raise InvalidCellRange(cell_range) from exc
 
 
 def convert_coordinate_to_position(
     coordinate: tuple[int, int],
-    grid_meta: GridMetadata,
+    grid_meta: "GridMetadata | GridGeometry",
 ) -> tuple[float, float]:
     x = coordinate[0]
     y = coordinate[1]
@@ -43,19 +150,95 @@ def convert_coordinate_to_position(
     return origin[0] + x_position, origin[1] + y_position
 
 
+def _get_axis_positions_python(
+    first: int, last: int, pitch: float, origin: float, mirrored: bool
+) -> list[float]:
+    half_pitch = pitch / 2
+    if mirrored:
+        return [origin + -(i * pitch + half_pitch) for i in range(first, last + 1)]
+    return [origin + (i * pitch + half_pitch) for i in range(first, last + 1)]
+
+
+def _get_axis_positions_numpy(
+    numpy: ModuleType,
+    first: int,
+    last: int,
+    pitch: float,
+    origin: float,
+    mirrored: bool,
+) -> list[float]:
+    positions = numpy.arange(first, last + 1, dtype=numpy.int64) * pitch
+    positions += pitch / 2
+    if mirrored:
+        positions *= -1
+    return (origin + positions).tolist()
+
+
+def get_axis_positions(
+    start: int,
+    end: int,
+    grid_meta: "GridMetadata | GridGeometry",
+    axis: int,
+) -> tuple[float, ...]:
+    """Positions of every cell between ``start`` and ``end`` along ``axis``.
+
+    Positions are ordered from the lower cell index to the higher one and
+    match ``convert_coordinate_to_position`` exactly, including mirroring
+    of the x axis for grids on the back of the board.  NumPy is used for
+    long ranges when it is installed.  Results are cached, so that grids
+    and board variants sharing a pitch and origin share their positions.
+
+    >>> get_axis_positions(2, 0, GridMetadata(), axis=0)
+    (1.27, 3.81, 6.35)
+    """
+    return _get_cached_axis_positions(
+        min(start, end),
+        max(start, end),
+        grid_meta.pitch,
+        grid_meta.origin[axis],
+        axis == 0 and grid_meta.back,
+    )
+
+
+@functools.lru_cache(maxsize=AXIS_CACHE_SIZE)
+def _get_cached_axis_positions(
+    first: int, last: int, pitch: float, origin: float, mirrored: bool
+) -> tuple[float, ...]:
+    numpy = get_numpy() if last - first + 1 >= NUMPY_MIN_CELLS else None
+    if numpy is not None:
+        positions = _get_axis_positions_numpy(
+            numpy, first, last, pitch, origin, mirrored
+        )
+    else:
+        positions = _get_axis_positions_python(first, last, pitch, origin, mirrored)
+    return tuple(positions)
+
+
+def get_drill_position_arrays(
+    start: tuple[int, int],
+    end: tuple[int, int],
+    grid_meta: "GridMetadata | GridGeometry",
+) -> tuple[list[float], list[float]]:
+    """X and Y positions of every hole in a cell range, column by column."""
+    columns = get_axis_positions(start[0], end[0], grid_meta, axis=0)
+    rows = get_axis_positions(start[1], end[1], grid_meta, axis=1)
+
+    cells = len(columns) * len(rows)
+    numpy = get_numpy() if cells >= NUMPY_MIN_CELLS else None
+    if numpy is not None:
+        return (
+            numpy.repeat(columns, len(rows)).tolist(),
+            numpy.tile(rows, len(columns)).tolist(),
+        )
+    return (
+        [x for x in columns for _ in rows],
+        [y for _ in columns for y in rows],
+    )
+
+
 def get_drill_positions_between_coordinates(
     start: tuple[int, int],
     end: tuple[int, int],
-    grid_meta: GridMetadata,
+    grid_meta: "GridMetadata | GridGeometry",
 ) -> Iterable[tuple[float, float]]:
-    start_x, start_y = start
-    end_x, end_y = end
-
-    x_offset = min(start_x, end_x)
-    y_offset = min(start_y, end_y)
-    for x in range(abs(end_x - start_x) + 1):
-        for y in range(abs(end_y - start_y) + 1):
-            position = convert_coordinate_to_position(
-                (x + x_offset, y + y_offset), grid_meta=grid_meta
-            )
-            yield position
+    return zip(*get_drill_position_arrays(start, end, grid_meta))
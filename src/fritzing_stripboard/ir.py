@@ -0,0 +1,191 @@
+from array import array
+from typing import Callable, Optional
+
+from .emitters import PartEmitter
+
+
+HOLE_PAD = 0
+HOLE_DRILLED = 1
+
+#: ``hole_bus`` value of holes that are not on any bus.
+NO_BUS = -1
+
+#: Holes replayed between calls to ``replay``'s ``checkpoint``.
+CHECKPOINT_INTERVAL = 4096
+
+
+class BoardIR:
+    """Compact struct-of-arrays record of everything the handlers emitted.
+
+    ``BoardIR`` implements the ``PartEmitter`` protocol, so handlers can
+    fill it exactly as they would any other emitter.  Holes, traces and
+    extra bus members are stored column-wise in typed arrays; each bus,
+    trace and extra member also records how many holes had been emitted
+    when it was created so that ``replay`` can reproduce the original
+    emission order for any other emitter.
+    """
+
+    def __init__(self):
+        self.hole_x = array("d")
+        self.hole_y = array("d")
+        self.hole_kind = array("B")
+        self.hole_bus = array("q")
+        self.hole_svg_ids: list[str] = []
+        self.hole_connector_ids: list[str] = []
+
+        self.bus_ids: list[str] = []
+        self.bus_offsets = array("q")
+
+        self.trace_ids: list[str] = []
+        self.trace_x1 = array("d")
+        self.trace_y1 = array("d")
+        self.trace_x2 = array("d")
+        self.trace_y2 = array("d")
+        self.trace_offsets = array("q")
+
+        self.member_connector_ids: list[str] = []
+        self.member_bus = array("q")
+        self.member_offsets = array("q")
+
+    @property
+    def hole_count(self) -> int:
+        return len(self.hole_x)
+
+    @property
+    def bus_count(self) -> int:
+        return len(self.bus_ids)
+
+    @property
+    def trace_count(self) -> int:
+        return len(self.trace_ids)
+
+    @property
+    def member_count(self) -> int:
+        return len(self.member_connector_ids)
+
+    def add_bus(self, bus_id: str) -> int:
+        self.bus_ids.append(bus_id)
+        self.bus_offsets.append(self.hole_count)
+        return len(self.bus_ids) - 1
+
+    def add_line(
+        self,
+        line_id: str,
+        start: tuple[float, float],
+        end: tuple[float, float],
+    ) -> None:
+        self.trace_ids.append(line_id)
+        self.trace_x1.append(start[0])
+        self.trace_y1.append(start[1])
+        self.trace_x2.append(end[0])
+        self.trace_y2.append(end[1])
+        self.trace_offsets.append(self.hole_count)
+
+    def add_hole(
+        self,
+        svg_id: str,
+        connector_id: str,
+        position: tuple[float, float],
+        bus: Optional[int],
+        drilled: bool = True,
+    ) -> None:
+        self.hole_svg_ids.append(svg_id)
+        self.hole_connector_ids.append(connector_id)
+        self.hole_x.append(position[0])
+        self.hole_y.append(position[1])
+        self.hole_kind.append(HOLE_DRILLED if drilled else HOLE_PAD)
+        self.hole_bus.append(NO_BUS if bus is None else bus)
+
+    def add_node_member(self, connector_id: str, bus: int) -> None:
+        self.member_connector_ids.append(connector_id)
+        self.member_bus.append(bus)
+        self.member_offsets.append(self.hole_count)
+
+    def extend(self, other: "BoardIR") -> None:
+        """Append everything recorded by ``other`` after this record.
+
+        ``other``'s buses are renumbered to follow this record's, so
+        replaying the result is the same as replaying both in turn.
+        """
+        hole_base = self.hole_count
+        bus_base = self.bus_count
+
+        self.hole_x.extend(other.hole_x)
+        self.hole_y.extend(other.hole_y)
+        self.hole_kind.extend(other.hole_kind)
+        self.hole_bus.extend(
+            NO_BUS if bus == NO_BUS else bus + bus_base for bus in other.hole_bus
+        )
+        self.hole_svg_ids.extend(other.hole_svg_ids)
+        self.hole_connector_ids.extend(other.hole_connector_ids)
+
+        self.bus_ids.extend(other.bus_ids)
+        self.bus_offsets.extend(offset + hole_base for offset in other.bus_offsets)
+
+        self.trace_ids.extend(other.trace_ids)
+        self.trace_x1.extend(other.trace_x1)
+        self.trace_y1.extend(other.trace_y1)
+        self.trace_x2.extend(other.trace_x2)
+        self.trace_y2.extend(other.trace_y2)
+        self.trace_offsets.extend(offset + hole_base for offset in other.trace_offsets)
+
+        self.member_connector_ids.extend(other.member_connector_ids)
+        self.member_bus.extend(bus + bus_base for bus in other.member_bus)
+        self.member_offsets.extend(
+            offset + hole_base for offset in other.member_offsets
+        )
+
+    def replay(
+        self,
+        emitter: PartEmitter,
+        checkpoint: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Serialize the recorded board through ``emitter``.
+
+        ``checkpoint``, if given, is called every ``CHECKPOINT_INTERVAL``
+        holes; it may raise to abandon the replay.
+        """
+        buses = []
+        bus_cursor = 0
+        trace_cursor = 0
+        member_cursor = 0
+
+        for hole in range(self.hole_count + 1):
+            while bus_cursor < self.bus_count and self.bus_offsets[bus_cursor] <= hole:
+                buses.append(emitter.add_bus(self.bus_ids[bus_cursor]))
+                bus_cursor += 1
+
+            while (
+                trace_cursor < self.trace_count
+                and self.trace_offsets[trace_cursor] <= hole
+            ):
+                emitter.add_line(
+                    self.trace_ids[trace_cursor],
+                    (self.trace_x1[trace_cursor], self.trace_y1[trace_cursor]),
+                    (self.trace_x2[trace_cursor], self.trace_y2[trace_cursor]),
+                )
+                trace_cursor += 1
+
+            while (
+                member_cursor < self.member_count
+                and self.member_offsets[member_cursor] <= hole
+            ):
+                emitter.add_node_member(
+                    self.member_connector_ids[member_cursor],
+                    buses[self.member_bus[member_cursor]],
+                )
+                member_cursor += 1
+
+            if hole == self.hole_count:
+                break
+            if checkpoint is not None and not hole % CHECKPOINT_INTERVAL:
+                checkpoint()
+
+            hole_bus = self.hole_bus[hole]
+            emitter.add_hole(
+                self.hole_svg_ids[hole],
+                self.hole_connector_ids[hole],
+                (self.hole_x[hole], self.hole_y[hole]),
+                None if hole_bus == NO_BUS else buses[hole_bus],
+                drilled=self.hole_kind[hole] == HOLE_DRILLED,
+            )
@@ -0,0 +1,63 @@
+import json
+from typing import IO, TYPE_CHECKING, Any, Union
+
+import yaml
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .types import BoardSpecification
+
+
+#: libyaml's loader is several times faster than the pure-Python one,
+#: but is only available when PyYAML was built against libyaml.
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+#: Marks the specs written by ``compiled.dump_compiled``.
+COMPILED_FORMAT = "fritzing-stripboard/compiled"
+COMPILED_VERSION = 1
+
+
+def parse_raw_specification(text: Union[str, bytes]) -> Any:
+    """Parse a YAML or JSON spec.
+
+    JSON documents are read with ``json``, which is much faster than
+    reading them as YAML; anything else goes through ``SafeLoader``.
+
+    >>> parse_raw_specification('{"meta": {"width": 10}}')
+    {'meta': {'width': 10}}
+    >>> parse_raw_specification("meta:\\n  width: 10")
+    {'meta': {'width': 10}}
+    """
+    if text.lstrip()[:1] in ("{", b"{"):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    return yaml.load(text, Loader=SafeLoader)
+
+
+def load_raw_specification(stream: IO[str]) -> Any:
+    return parse_raw_specification(stream.read())
+
+
+def is_compiled(data: Any) -> bool:
+    return isinstance(data, dict) and data.get("format") == COMPILED_FORMAT
+
+
+def parse_specification(data: Any) -> "BoardSpecification":
+    """Build the models for raw spec ``data``.
+
+    Specs written by ``dump_compiled`` are constructed without being
+    validated again; see ``compiled.py``.
+    """
+    # Imported here so that loading a spec for ``check_specification``
+    # alone does not import pydantic.
+    from .compiled import construct_specification
+    from .types import BoardSpecification
+
+    if is_compiled(data):
+        return construct_specification(data)
+    return BoardSpecification.parse_obj(data)
+
+
+def load_specification(stream: IO[str]) -> "BoardSpecification":
+    return parse_specification(load_raw_specification(stream))
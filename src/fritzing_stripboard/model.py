@@ -0,0 +1,143 @@
+"""The immutable board model that handlers build from.
+
+Specs are validated by the pydantic models in ``types.py``;
+``convert_board`` then copies what the handlers need into the frozen,
+slotted classes below.  Cell ranges are parsed into integers and grid
+metadata resolved once, so the handlers' loops read plain slots rather
+than going through pydantic, and each component takes a fraction of
+the memory of its validated model.
+"""
+import dataclasses
+from typing import Any, Union
+
+from .grid import CellRange, parse_cell_range
+from .types import (
+    BoardMetadata,
+    BoardSpecification,
+    GridDefinition,
+    GridMetadata,
+    SharedBus,
+    XYBus,
+    XYDrilledBus,
+    XYDrilledBusColumns,
+    XYDrilledBusRows,
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class GridGeometry:
+    pitch: float
+    origin: tuple[float, float]
+    back: bool
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Line:
+    """A ``bus`` (``drilled=False``) or ``drilled`` line of holes."""
+
+    id: str
+    cell_range: str
+    cells: CellRange
+    drilled: bool
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Rows:
+    """``drilled_rows``: one bus per row of the range."""
+
+    id: str
+    cell_range: str
+    cells: CellRange
+    #: Index of the first row of ``cells`` among the rows of
+    #: ``cell_range``; non-zero for the tiles made by ``tiles.py``.
+    offset: int = 0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Columns:
+    """``drilled_columns``: one bus per column of the range."""
+
+    id: str
+    cell_range: str
+    cells: CellRange
+    #: Index of the first column of ``cells``; see ``Rows.offset``.
+    offset: int = 0
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Group:
+    """``shared_bus``: components sharing a single bus."""
+
+    id: str
+    members: tuple["Component", ...]
+
+
+Component = Union[Line, Rows, Columns, Group]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Grid:
+    meta: GridGeometry
+    components: tuple[Component, ...]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Board:
+    meta: BoardMetadata
+    grids: tuple[Grid, ...]
+
+
+def convert_grid_meta(meta: GridMetadata) -> GridGeometry:
+    return GridGeometry(
+        pitch=meta.pitch,
+        origin=(meta.origin[0], meta.origin[1]),
+        back=meta.back,
+    )
+
+
+def convert_component(component: Any) -> Component:
+    """Copy one validated grid component into the model.
+
+    Components of types this module does not know are kept as they are.
+
+    >>> line = convert_component(XYBus(id="power", bus="A1:A3"))
+    >>> line.cells, line.drilled
+    (CellRange(start_x=0, start_y=1, end_x=0, end_y=3), False)
+    """
+    component_id = str(component.id)
+
+    if isinstance(component, SharedBus):
+        return Group(
+            id=component_id,
+            members=tuple(convert_component(item) for item in component.shared_bus),
+        )
+    elif isinstance(component, XYDrilledBusRows):
+        cell_range = component.drilled_rows
+        return Rows(component_id, cell_range, parse_cell_range(cell_range))
+    elif isinstance(component, XYDrilledBusColumns):
+        cell_range = component.drilled_columns
+        return Columns(component_id, cell_range, parse_cell_range(cell_range))
+    elif isinstance(component, XYDrilledBus):
+        cell_range = component.drilled
+        return Line(component_id, cell_range, parse_cell_range(cell_range), True)
+    elif isinstance(component, XYBus):
+        cell_range = component.bus
+        return Line(component_id, cell_range, parse_cell_range(cell_range), False)
+    # Anything else is taken to be a model object of a third-party type,
+    # handled by whatever was registered for it in ``HANDLER_REGISTRY``.
+    return component
+
+
+def convert_grid(grid_definition: GridDefinition) -> Grid:
+    grid = grid_definition.grid
+    return Grid(
+        meta=convert_grid_meta(grid.meta),
+        components=tuple(convert_component(item) for item in grid.components),
+    )
+
+
+def convert_board(board: BoardSpecification) -> Board:
+    return Board(
+        meta=board.meta,
+        grids=tuple(convert_grid(item) for item in board.board),
+    )
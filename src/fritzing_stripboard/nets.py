@@ -0,0 +1,208 @@
+from array import array
+from typing import Any, Iterable, Iterator, Optional
+
+from .emitters import PartEmitter
+from .grid import (
+    CellRange,
+    RangeTable,
+    get_cell_range_string,
+    parse_cell_range,
+    walk_components,
+)
+from .types import (
+    BoardSpecification,
+    GridDefinitionData,
+    SharedBus,
+    XYDrilledBusColumns,
+    XYDrilledBusRows,
+)
+
+
+class DisjointSet:
+    """Union-find over the integers ``0 .. size - 1``.
+
+    Uses union by size and path halving, so any sequence of operations
+    runs in near-linear time.  Every set also remembers its smallest
+    member, which ``get_first`` returns.
+    """
+
+    def __init__(self, size: int = 0):
+        self.parent = array("q", range(size))
+        self.size = array("q", [1]) * size
+        self.first = array("q", range(size))
+
+    def add(self) -> int:
+        item = len(self.parent)
+        self.parent.append(item)
+        self.size.append(1)
+        self.first.append(item)
+        return item
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int) -> int:
+        first = self.find(first)
+        second = self.find(second)
+        if first == second:
+            return first
+
+        if self.size[first] < self.size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+        self.first[first] = min(self.first[first], self.first[second])
+        return first
+
+    def get_first(self, item: int) -> int:
+        return self.first[self.find(item)]
+
+
+def _get_range(component: Any, ranges: Optional[RangeTable]) -> Optional[CellRange]:
+    cell_range = get_cell_range_string(component)
+    if cell_range is None:
+        return None
+    if ranges is not None:
+        return ranges[cell_range]
+    return parse_cell_range(cell_range)
+
+
+def get_conductors(
+    components: Iterable[Any], ranges: Optional[RangeTable] = None
+) -> Iterator[tuple[str, list[CellRange]]]:
+    """Yield the id and cells of every bus the handlers would fill with holes.
+
+    Buses are yielded in the order the handlers create them: one per row
+    of ``drilled_rows``, one per column of ``drilled_columns``, one per
+    ``bus`` or ``drilled`` line and one for each top-level ``shared_bus``
+    covering everything nested inside it.
+    """
+    for component in components:
+        if isinstance(component, SharedBus):
+            rectangles = [
+                rectangle
+                for nested in walk_components(component.shared_bus)
+                if (rectangle := _get_range(nested, ranges)) is not None
+            ]
+            yield str(component.id), rectangles
+            continue
+
+        rectangle = _get_range(component, ranges)
+        if rectangle is None:
+            continue
+
+        min_x, max_x = sorted((rectangle.start_x, rectangle.end_x))
+        min_y, max_y = sorted((rectangle.start_y, rectangle.end_y))
+        if isinstance(component, XYDrilledBusRows):
+            for y in range(min_y, max_y + 1):
+                yield f"{component.id}-{y - min_y}", [CellRange(min_x, y, max_x, y)]
+        elif isinstance(component, XYDrilledBusColumns):
+            for x in range(min_x, max_x + 1):
+                yield f"{component.id}-{x - min_x}", [CellRange(x, min_y, x, max_y)]
+        else:
+            yield str(component.id), [rectangle]
+
+
+def build_grid_nets(
+    grid: GridDefinitionData, ranges: Optional[RangeTable] = None
+) -> dict[str, str]:
+    """Map the id of every bus of ``grid`` to the id of the net it joins.
+
+    Buses sharing any cell are joined; a net takes the id of the bus the
+    handlers create first.
+    """
+    conductors = list(get_conductors(grid.components, ranges))
+    width = 1 + max(
+        (max(r.start_x, r.end_x) for _, rs in conductors for r in rs), default=-1
+    )
+    height = 1 + max(
+        (max(r.start_y, r.end_y) for _, rs in conductors for r in rs), default=-1
+    )
+
+    nets = DisjointSet(len(conductors))
+    owners = array("q", [-1]) * (width * height)
+
+    for conductor, (_, rectangles) in enumerate(conductors):
+        for rectangle in rectangles:
+            min_x, max_x = sorted((rectangle.start_x, rectangle.end_x))
+            min_y, max_y = sorted((rectangle.start_y, rectangle.end_y))
+            for y in range(min_y, max_y + 1):
+                row = y * width
+                for cell in range(row + min_x, row + max_x + 1):
+                    owner = owners[cell]
+                    if owner < 0:
+                        owners[cell] = conductor
+                    elif owner != conductor:
+                        nets.union(owner, conductor)
+
+    return {
+        bus_id: conductors[nets.get_first(conductor)][0]
+        for conductor, (bus_id, _) in enumerate(conductors)
+    }
+
+
+def build_nets(
+    board: BoardSpecification, ranges: Optional[RangeTable] = None
+) -> dict[str, str]:
+    """Map every bus id of ``board`` to its net; see ``build_grid_nets``.
+
+    Grids are independent: buses on different grids are never joined.
+    """
+    nets: dict[str, str] = {}
+    for grid_definition in board.board:
+        nets.update(build_grid_nets(grid_definition.grid, ranges))
+    return nets
+
+
+class NetEmitter:
+    """Emits one bus per net instead of one per handler-created bus.
+
+    Holes are forwarded without a bus as they arrive, while their
+    connector ids are collected per net; ``flush`` then writes the net
+    table through the wrapped emitter in the order the nets were first
+    created.  Buses missing from ``nets`` (such as the empty buses of
+    components nested in a ``shared_bus``) are kept as nets of their own.
+    """
+
+    def __init__(self, emitter: PartEmitter, nets: dict[str, str]):
+        self.emitter = emitter
+        self.nets = nets
+        self._members: dict[str, list[str]] = {}
+
+    def add_bus(self, bus_id: str) -> str:
+        net_id = self.nets.get(bus_id, bus_id)
+        self._members.setdefault(net_id, [])
+        return net_id
+
+    def add_line(
+        self,
+        line_id: str,
+        start: tuple[float, float],
+        end: tuple[float, float],
+    ) -> None:
+        self.emitter.add_line(line_id, start, end)
+
+    def add_hole(
+        self,
+        svg_id: str,
+        connector_id: str,
+        position: tuple[float, float],
+        bus: str,
+        drilled: bool = True,
+    ) -> None:
+        self.emitter.add_hole(svg_id, connector_id, position, None, drilled=drilled)
+        self._members[bus].append(connector_id)
+
+    def add_node_member(self, connector_id: str, bus: str) -> None:
+        self._members[bus].append(connector_id)
+
+    def flush(self) -> None:
+        for net_id, members in self._members.items():
+            bus = self.emitter.add_bus(net_id)
+            for connector_id in members:
+                self.emitter.add_node_member(connector_id, bus)
+        self._members = {}
@@ -0,0 +1,234 @@
+from array import array
+from typing import Any, NamedTuple, Optional
+
+from .emitters import PartEmitter
+from .grid import (
+    CellRange,
+    RangeTable,
+    convert_coordinate_to_position,
+    get_cell_range_string,
+    parse_cell_range,
+    walk_components,
+)
+from .types import BoardSpecification, GridDefinitionData, XYBus
+
+
+class Overlap(NamedTuple):
+    grid: int
+    first: str
+    first_range: str
+    second: str
+    second_range: str
+    cells: int
+    example: tuple[int, int]
+
+
+class OccupancyIndex:
+    """Bitmap of the cells of one grid that are covered by a component.
+
+    Components are added one at a time; each addition costs time linear
+    in the number of cells the component covers, and any cells it shares
+    with earlier components are recorded as overlaps.  Cells covered by
+    a component that drills its holes are also marked in ``drilled``.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.bitmap = bytearray(width * height)
+        self.drilled = bytearray(width * height)
+        self.owners = array("q", bytes(8 * width * height))
+        self.component_ids: list[str] = []
+        self.component_ranges: list[str] = []
+        self.contested: set[tuple[int, int]] = set()
+        self._overlaps: dict[tuple[int, int], list] = {}
+
+    def is_occupied(self, x: int, y: int) -> bool:
+        return bool(self.bitmap[y * self.width + x])
+
+    def is_drilled(self, x: int, y: int) -> bool:
+        return bool(self.drilled[y * self.width + x])
+
+    def add(
+        self,
+        component_id: str,
+        cell_range: str,
+        rectangle: CellRange,
+        drilled: bool = True,
+    ) -> None:
+        self.component_ids.append(component_id)
+        self.component_ranges.append(cell_range)
+        owner = len(self.component_ids)
+
+        min_x, max_x = sorted((rectangle.start_x, rectangle.end_x))
+        min_y, max_y = sorted((rectangle.start_y, rectangle.end_y))
+        row_width = max_x - min_x + 1
+        marked = b"\x01" * row_width
+        owned = array("q", [owner]) * row_width
+
+        for y in range(min_y, max_y + 1):
+            row_start = y * self.width + min_x
+            row_end = row_start + row_width
+            row = self.bitmap[row_start:row_end]
+
+            if row.count(0) != row_width:
+                for offset, occupied in enumerate(row):
+                    if not occupied:
+                        continue
+                    self._add_overlap(
+                        self.owners[row_start + offset], owner, (min_x + offset, y)
+                    )
+                self.owners[row_start:row_end] = array(
+                    "q",
+                    (
+                        previous if occupied else owner
+                        for previous, occupied in zip(
+                            self.owners[row_start:row_end], row
+                        )
+                    ),
+                )
+            else:
+                self.owners[row_start:row_end] = owned
+
+            self.bitmap[row_start:row_end] = marked
+            if drilled:
+                self.drilled[row_start:row_end] = marked
+
+    def _add_overlap(self, first: int, second: int, cell: tuple[int, int]) -> None:
+        self.contested.add(cell)
+        overlap = self._overlaps.setdefault((first, second), [0, cell])
+        overlap[0] += 1
+
+    def get_overlaps(self, grid: int = 0) -> list[Overlap]:
+        return [
+            Overlap(
+                grid=grid,
+                first=self.component_ids[first - 1],
+                first_range=self.component_ranges[first - 1],
+                second=self.component_ids[second - 1],
+                second_range=self.component_ranges[second - 1],
+                cells=cells,
+                example=example,
+            )
+            for (first, second), (cells, example) in self._overlaps.items()
+        ]
+
+
+def build_occupancy_index(
+    grid: GridDefinitionData, ranges: Optional[RangeTable] = None
+) -> OccupancyIndex:
+    rectangles = []
+    for component in walk_components(grid.components):
+        cell_range = get_cell_range_string(component)
+        if cell_range is None:
+            continue
+        if ranges is not None:
+            rectangle = ranges[cell_range]
+        else:
+            rectangle = parse_cell_range(cell_range)
+        rectangles.append(
+            (
+                str(component.id),
+                cell_range,
+                rectangle,
+                not isinstance(component, XYBus),
+            )
+        )
+
+    width = max((max(r.start_x, r.end_x) for _, _, r, _ in rectangles), default=-1) + 1
+    height = max((max(r.start_y, r.end_y) for _, _, r, _ in rectangles), default=-1) + 1
+
+    index = OccupancyIndex(width, height)
+    for component_id, cell_range, rectangle, drilled in rectangles:
+        index.add(component_id, cell_range, rectangle, drilled=drilled)
+
+    return index
+
+
+def find_overlaps(
+    board: BoardSpecification, ranges: Optional[RangeTable] = None
+) -> list[Overlap]:
+    """List every pair of components covering the same cells of a grid."""
+    overlaps: list[Overlap] = []
+
+    for grid_index, grid_definition in enumerate(board.board):
+        index = build_occupancy_index(grid_definition.grid, ranges)
+        overlaps.extend(index.get_overlaps(grid_index))
+
+    return overlaps
+
+
+def get_contested_positions(
+    board: BoardSpecification, ranges: Optional[RangeTable] = None
+) -> dict[tuple[float, float], bool]:
+    """Map each position covered by several components to whether any of
+    them drills a hole there.
+    """
+    positions: dict[tuple[float, float], bool] = {}
+
+    for grid_definition in board.board:
+        grid = grid_definition.grid
+        index = build_occupancy_index(grid, ranges)
+        for cell in index.contested:
+            position = convert_coordinate_to_position(cell, grid_meta=grid.meta)
+            drilled = index.is_drilled(*cell)
+            positions[position] = positions.get(position, False) or drilled
+
+    return positions
+
+
+class MergingEmitter:
+    """Collapses holes drilled at the same position into one connector.
+
+    Only ``positions`` (those found to be contested by an
+    ``OccupancyIndex``) are tracked.  The first hole at a position keeps
+    its circle and connector; later ones only add that connector to their
+    own bus, joining the two nets the way the shared hole does physically.
+    The kept hole is drilled if any hole at its position is, as given by
+    the values of ``positions``, so that a pad emitted first never hides
+    a drilled hole.
+    """
+
+    def __init__(
+        self, emitter: PartEmitter, positions: dict[tuple[float, float], bool]
+    ):
+        self.emitter = emitter
+        self.positions = positions
+        self.merged = 0
+        self._holes: dict[tuple[float, float], tuple[str, list[Any]]] = {}
+
+    def add_bus(self, bus_id: str) -> Any:
+        return self.emitter.add_bus(bus_id)
+
+    def add_line(
+        self,
+        line_id: str,
+        start: tuple[float, float],
+        end: tuple[float, float],
+    ) -> None:
+        self.emitter.add_line(line_id, start, end)
+
+    def add_hole(
+        self,
+        svg_id: str,
+        connector_id: str,
+        position: tuple[float, float],
+        bus: Any,
+        drilled: bool = True,
+    ) -> None:
+        if position in self.positions:
+            existing = self._holes.get(position)
+            if existing is not None:
+                existing_id, buses = existing
+                if bus not in buses:
+                    self.emitter.add_node_member(existing_id, bus)
+                    buses.append(bus)
+                self.merged += 1
+                return
+            self._holes[position] = (connector_id, [bus])
+            drilled = drilled or self.positions[position]
+
+        self.emitter.add_hole(svg_id, connector_id, position, bus, drilled=drilled)
+
+    def add_node_member(self, connector_id: str, bus: Any) -> None:
+        self.emitter.add_node_member(connector_id, bus)
@@ -0,0 +1,187 @@
+import contextlib
+import cProfile
+import time
+from typing import Any, Iterator, Optional
+
+from .emitters import PartEmitter
+from .types import NodeHandler
+
+
+_active: Optional["Profiler"] = None
+
+
+class ComponentStats:
+    __slots__ = (
+        "id",
+        "type",
+        "handler",
+        "depth",
+        "seconds",
+        "buses",
+        "lines",
+        "circles",
+        "connectors",
+        "node_members",
+    )
+
+    def __init__(self, component_id: str, type_: str, handler: str, depth: int):
+        self.id = component_id
+        self.type = type_
+        self.handler = handler
+        self.depth = depth
+        self.seconds = 0.0
+        self.buses = 0
+        self.lines = 0
+        self.circles = 0
+        self.connectors = 0
+        self.node_members = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class CountingEmitter:
+    """Forwards to ``emitter`` while counting what a component emitted."""
+
+    def __init__(self, emitter: PartEmitter, stats: ComponentStats):
+        self.emitter = emitter
+        self.stats = stats
+
+    def add_bus(self, bus_id: str) -> Any:
+        self.stats.buses += 1
+        return self.emitter.add_bus(bus_id)
+
+    def add_line(
+        self,
+        line_id: str,
+        start: tuple[float, float],
+        end: tuple[float, float],
+    ) -> None:
+        self.stats.lines += 1
+        self.emitter.add_line(line_id, start, end)
+
+    def add_hole(
+        self,
+        svg_id: str,
+        connector_id: str,
+        position: tuple[float, float],
+        bus: Any,
+        drilled: bool = True,
+    ) -> None:
+        self.stats.circles += 1
+        self.stats.connectors += 1
+        if bus is not None:
+            self.stats.node_members += 1
+        self.emitter.add_hole(svg_id, connector_id, position, bus, drilled=drilled)
+
+    def add_node_member(self, connector_id: str, bus: Any) -> None:
+        self.stats.node_members += 1
+        self.emitter.add_node_member(connector_id, bus)
+
+
+class Profiler:
+    """Collects phase timings and per-component handler statistics.
+
+    Handlers run from a flat execution plan, so timings and counts are
+    exclusive: a ``shared_bus`` is credited only with its own bus, and
+    its members are listed after it at the next ``depth``.
+    """
+
+    def __init__(self, cprofile: bool = False):
+        self.phases: dict[str, dict[str, float]] = {}
+        self.components: list[ComponentStats] = []
+        self.cprofile = cProfile.Profile() if cprofile else None
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            phase = self.phases.setdefault(name, {"calls": 0, "seconds": 0.0})
+            phase["calls"] += 1
+            phase["seconds"] += time.perf_counter() - started
+
+    def wrap_handler(
+        self, handler: NodeHandler, component: Any, depth: int = 0
+    ) -> NodeHandler:
+        def profiled_handler(emitter: PartEmitter, config: Any, **kwargs) -> Any:
+            stats = ComponentStats(
+                str(getattr(config, "id", "")),
+                type(config).__name__,
+                handler.__name__,
+                depth,
+            )
+            self.components.append(stats)
+
+            started = time.perf_counter()
+            try:
+                return handler(CountingEmitter(emitter, stats), config, **kwargs)
+            finally:
+                stats.seconds = time.perf_counter() - started
+
+        return profiled_handler
+
+    def get_report(self) -> dict[str, Any]:
+        handlers: dict[str, dict[str, float]] = {}
+        totals = {
+            "buses": 0,
+            "lines": 0,
+            "circles": 0,
+            "connectors": 0,
+            "node_members": 0,
+        }
+
+        for stats in self.components:
+            handler = handlers.setdefault(stats.handler, {"calls": 0, "seconds": 0.0})
+            handler["calls"] += 1
+            handler["seconds"] += stats.seconds
+            for name in totals:
+                totals[name] += getattr(stats, name)
+
+        return {
+            "phases": self.phases,
+            "handlers": handlers,
+            "totals": totals,
+            "components": [stats.as_dict() for stats in self.components],
+        }
+
+    def dump_cprofile(self, path: str) -> None:
+        if self.cprofile is None:
+            raise ValueError("cProfile was not enabled for this profiler")
+        self.cprofile.dump_stats(path)
+
+
+def get_active_profiler() -> Optional[Profiler]:
+    return _active
+
+
+@contextlib.contextmanager
+def profile(cprofile: bool = False) -> Iterator[Profiler]:
+    """Profile every build started within the block.
+
+    >>> with profile() as profiler:
+    ...     pass
+    >>> profiler.get_report()["totals"]["circles"]
+    0
+    """
+    global _active
+
+    profiler = Profiler(cprofile=cprofile)
+    previous = _active
+    _active = profiler
+    if profiler.cprofile is not None:
+        profiler.cprofile.enable()
+    try:
+        yield profiler
+    finally:
+        if profiler.cprofile is not None:
+            profiler.cprofile.disable()
+        _active = previous
+
+
+def phase(name: str) -> contextlib.AbstractContextManager:
+    """Time ``name`` on the active profiler; a no-op when profiling is off."""
+    if _active is None:
+        return contextlib.nullcontext()
+    return _active.phase(name)
@@ -0,0 +1,94 @@
+import sys
+import time
+from typing import IO, Callable, Optional, Protocol
+
+
+#: Seconds between progress reports.
+DEFAULT_INTERVAL = 1.0
+
+
+class ProgressMonitor(Protocol):
+    """Told by ``run_plan`` how many holes a build emits, and as it does."""
+
+    def start(self, total: int) -> None:
+        ...
+
+    def advance(self, holes: int) -> None:
+        ...
+
+    def finish(self) -> None:
+        ...
+
+
+def format_duration(seconds: float) -> str:
+    """
+    >>> format_duration(75.2)
+    '1:15'
+    >>> format_duration(3725)
+    '1:02:05'
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02}:{seconds:02}"
+    return f"{minutes}:{seconds:02}"
+
+
+class Progress:
+    """Reports the holes emitted so far, their rate and the time left.
+
+    ``run_plan`` calls ``advance`` after every plan step, so reports are
+    at most one step apart; ``tiles.py`` keeps the steps of large
+    components small.  A line is written to ``output`` at most every
+    ``interval`` seconds, and once more when the build finishes.
+    """
+
+    def __init__(
+        self,
+        output: Optional[IO[str]] = None,
+        interval: float = DEFAULT_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.output = output if output is not None else sys.stderr
+        self.interval = interval
+        self.clock = clock
+        self.total = 0
+        self.done = 0
+        self._started = 0.0
+        self._reported = 0.0
+
+    def start(self, total: int) -> None:
+        self.total = total
+        self.done = 0
+        self._started = self._reported = self.clock()
+
+    def advance(self, holes: int) -> None:
+        self.done += holes
+        now = self.clock()
+        if now - self._reported >= self.interval:
+            self._reported = now
+            self.report(now)
+
+    def finish(self) -> None:
+        self.report(self.clock())
+
+    def get_message(self, now: float) -> str:
+        """
+        >>> progress = Progress(clock=lambda: 0.0)
+        >>> progress.start(1000)
+        >>> progress.done = 250
+        >>> progress.get_message(2.0)
+        '250/1000 holes (25%), 125 holes/s, ETA 0:06'
+        """
+        elapsed = now - self._started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        message = f"{self.done}/{self.total} holes"
+        if self.total:
+            message += f" ({self.done / self.total:.0%})"
+        message += f", {rate:,.0f} holes/s"
+        if rate and self.done < self.total:
+            message += f", ETA {format_duration((self.total - self.done) / rate)}"
+        return message
+
+    def report(self, now: float) -> None:
+        print(self.get_message(now), file=self.output, flush=True)
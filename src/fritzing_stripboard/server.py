@@ -0,0 +1,434 @@
+"""Local generation service.
+
+``serve`` runs an asyncio HTTP server, on a TCP port or a Unix socket,
+that accepts a board specification as YAML or JSON and answers with the
+built ``.fzpz`` archive.  Builds run on a process pool whose workers are
+started, and have imported the generator, before the first request
+arrives.
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import json
+import os
+import socket
+import statistics
+import sys
+import time
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import yaml
+
+from .cache import BuildCache
+from .emitters import SvgFormat
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_MAX_BODY = 16 * 1024 * 1024
+
+#: Number of recent requests whose timings are kept for ``/metrics``.
+TIMING_WINDOW = 1000
+
+#: Flags accepted by ``POST /build`` and passed to ``build_zip``; the
+#: ``compact_svg`` parameter takes the number of decimals to keep.
+BUILD_OPTIONS = ("stream", "merge_overlaps", "merge_nets")
+
+STATUS_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class SpecificationError(Exception):
+    pass
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def _warm_worker() -> None:
+    # Importing here, once per worker process, keeps that cost out of
+    # the first request each worker serves.
+    from . import loader, zip  # noqa: F401
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def build_archive(
+    body: bytes,
+    content_type: str,
+    options: dict[str, Any],
+    cache: Optional[BuildCache] = None,
+) -> bytes:
+    """Build the spec in ``body`` and return the archive's bytes.
+
+    Runs in a worker process.
+    """
+    from .loader import SafeLoader
+    from .types import BoardSpecification
+    from .zip import build_zip_bytes
+
+    try:
+        if content_type == "application/json":
+            data = json.loads(body)
+        else:
+            data = yaml.load(body, Loader=SafeLoader)
+        board = BoardSpecification.parse_obj(data)
+    except Exception as exc:
+        raise SpecificationError(f"{type(exc).__name__}: {exc}") from None
+
+    compact_svg = options.pop("compact_svg", None)
+    if compact_svg is not None:
+        options["svg_format"] = SvgFormat(compact_svg)
+
+    return build_zip_bytes(board, cache=cache, **options)
+
+
+class ServiceMetrics:
+    def __init__(self):
+        self.started = time.time()
+        self.requests = 0
+        self.builds = 0
+        self.failures = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.queue_seconds: deque[float] = deque(maxlen=TIMING_WINDOW)
+        self.build_seconds: deque[float] = deque(maxlen=TIMING_WINDOW)
+        self.total_seconds: deque[float] = deque(maxlen=TIMING_WINDOW)
+
+    @staticmethod
+    def _summarize(samples: deque) -> dict[str, Optional[float]]:
+        if not samples:
+            return {"count": 0, "mean": None, "p50": None, "p95": None, "max": None}
+        ordered = sorted(samples)
+        return {
+            "count": len(ordered),
+            "mean": statistics.fmean(ordered),
+            "p50": ordered[len(ordered) // 2],
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "max": ordered[-1],
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "uptime": time.time() - self.started,
+            "requests": self.requests,
+            "builds": self.builds,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "queue_seconds": self._summarize(self.queue_seconds),
+            "build_seconds": self._summarize(self.build_seconds),
+            "total_seconds": self._summarize(self.total_seconds),
+        }
+
+
+class GenerationService:
+    """Serves builds from a warm process pool.
+
+    At most ``workers`` builds run at once and up to ``queue_size`` more
+    wait for a worker; requests beyond that are refused straight away
+    with ``503 Service Unavailable`` rather than queueing without bound.
+    A build that times out still counts towards both limits until its
+    worker has finished it.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_body: int = DEFAULT_MAX_BODY,
+        cache: Optional[BuildCache] = None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.max_body = max_body
+        self.cache = cache
+
+        self.metrics = ServiceMetrics()
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self._admission = asyncio.BoundedSemaphore(self.workers + queue_size)
+        self._workers = asyncio.Semaphore(self.workers)
+
+    async def start(self) -> None:
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_warm_worker
+        )
+        loop = asyncio.get_running_loop()
+        # Workers are spawned lazily; touching every one of them now
+        # starts and warms them before the first request.
+        await asyncio.gather(
+            *(loop.run_in_executor(self.executor, _ping) for _ in range(self.workers))
+        )
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    async def build(
+        self, body: bytes, content_type: str, options: dict[str, Any]
+    ) -> bytes:
+        if self._admission.locked():
+            self.metrics.rejected += 1
+            raise HTTPError(503, "Too many pending builds", {"Retry-After": "1"})
+
+        await self._admission.acquire()
+        self.metrics.in_flight += 1
+        queued = time.perf_counter()
+        try:
+            await self._workers.acquire()
+        except BaseException:
+            self._admission.release()
+            self.metrics.in_flight -= 1
+            raise
+
+        started = time.perf_counter()
+        self.metrics.queue_seconds.append(started - queued)
+        return await self._run_build(body, content_type, options, started)
+
+    def _finish_build(self) -> None:
+        self._workers.release()
+        self._admission.release()
+        self.metrics.in_flight -= 1
+
+    async def _run_build(
+        self,
+        body: bytes,
+        content_type: str,
+        options: dict[str, Any],
+        started: float,
+    ) -> bytes:
+        loop = asyncio.get_running_loop()
+        try:
+            job = self.executor.submit(
+                build_archive, body, content_type, options, cache=self.cache
+            )
+        except BaseException:
+            self._finish_build()
+            raise
+
+        def on_done(_: Future) -> None:
+            # A timeout cannot stop a build a worker has started, so the
+            # build keeps its slots until the worker is done with it rather
+            # than until the request gives up on it.
+            try:
+                loop.call_soon_threadsafe(self._finish_build)
+            except RuntimeError:
+                # The loop, and the service with it, has already closed.
+                pass
+
+        job.add_done_callback(on_done)
+
+        try:
+            archive = await asyncio.wait_for(asyncio.wrap_future(job), self.timeout)
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            raise HTTPError(504, f"Build took longer than {self.timeout}s") from None
+        except SpecificationError as exc:
+            self.metrics.failures += 1
+            raise HTTPError(400, str(exc)) from None
+        except Exception as exc:
+            self.metrics.failures += 1
+            raise HTTPError(500, f"{type(exc).__name__}: {exc}") from None
+        finally:
+            self.metrics.build_seconds.append(time.perf_counter() - started)
+
+        self.metrics.builds += 1
+        return archive
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        started = time.perf_counter()
+        try:
+            try:
+                status, headers, body = await self._handle_request(reader)
+            except HTTPError as exc:
+                status = exc.status
+                headers = {"Content-Type": "text/plain; charset=utf-8", **exc.headers}
+                body = f"{exc}\n".encode("utf-8")
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+
+            self.metrics.requests += 1
+            self.metrics.total_seconds.append(time.perf_counter() - started)
+            await self._write_response(writer, status, headers, body)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _handle_request(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[int, dict[str, str], bytes]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line") from None
+
+        headers: dict[str, str] = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        url = urlsplit(target)
+        if url.path == "/metrics":
+            if method != "GET":
+                raise HTTPError(405, "Use GET", {"Allow": "GET"})
+            body = json.dumps(self.metrics.as_dict(), indent=2).encode("utf-8")
+            return 200, {"Content-Type": "application/json"}, body
+        elif url.path == "/build":
+            if method != "POST":
+                raise HTTPError(405, "Use POST", {"Allow": "POST"})
+        else:
+            raise HTTPError(404, f"No such endpoint: {url.path}")
+
+        if "content-length" not in headers:
+            raise HTTPError(411, "Content-Length is required")
+        try:
+            length = int(headers["content-length"])
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length") from None
+        if length > self.max_body:
+            raise HTTPError(413, f"Specs are limited to {self.max_body} bytes")
+        body = await reader.readexactly(length)
+
+        query = parse_qs(url.query)
+        options: dict[str, Any] = {
+            name: query[name][-1].lower() in ("1", "true", "yes")
+            for name in BUILD_OPTIONS
+            if name in query
+        }
+        if "compact_svg" in query:
+            try:
+                options["compact_svg"] = int(query["compact_svg"][-1])
+            except ValueError:
+                raise HTTPError(400, "compact_svg must be an integer") from None
+        content_type = headers.get("content-type", "").split(";")[0].strip()
+
+        archive = await self.build(body, content_type, options)
+        return 200, {"Content-Type": "application/zip"}, archive
+
+    @staticmethod
+    async def _write_response(
+        writer: asyncio.StreamWriter, status: int, headers: dict[str, str], body: bytes
+    ) -> None:
+        lines = [f"HTTP/1.1 {status} {STATUS_REASONS.get(status, '')}"]
+        headers = {
+            **headers,
+            "Content-Length": str(len(body)),
+            "Connection": "close",
+        }
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        writer.write(body)
+        await writer.drain()
+
+
+async def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    unix_socket: Optional[str] = None,
+    ready: Optional[asyncio.Event] = None,
+    **kwargs,
+) -> None:
+    """Run a ``GenerationService`` until cancelled.
+
+    Listens on ``unix_socket`` if given, otherwise on ``host``:``port``;
+    ``kwargs`` are passed to ``GenerationService``.  ``ready`` is set
+    once the workers are warm and the server is accepting connections.
+    """
+    service = GenerationService(**kwargs)
+    await service.start()
+    try:
+        if unix_socket is not None:
+            server = await asyncio.start_unix_server(
+                service.handle_connection, path=unix_socket
+            )
+        else:
+            server = await asyncio.start_server(
+                service.handle_connection, host=host, port=port
+            )
+
+        async with server:
+            for listener in server.sockets:
+                print(f"Listening on {listener.getsockname()}", file=sys.stderr)
+            if ready is not None:
+                ready.set()
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def request_build(
+    spec: bytes,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    unix_socket: Optional[str] = None,
+    content_type: str = "application/yaml",
+    timeout: Optional[float] = None,
+    **options: bool,
+) -> bytes:
+    """Send ``spec`` to a running server and return the built archive.
+
+    Raises ``HTTPError`` if the server could not build it.
+    """
+    if unix_socket is not None:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(timeout)
+        connection.connect(unix_socket)
+    else:
+        connection = socket.create_connection((host, port), timeout=timeout)
+
+    query = "&".join(f"{name}={int(value)}" for name, value in options.items())
+    request = (
+        f"POST /build{'?' + query if query else ''} HTTP/1.1\r\n"
+        f"Host: {host}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(spec)}\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode("latin-1")
+
+    with connection, connection.makefile("rb") as response:
+        connection.sendall(request + spec)
+        status = int(response.readline().split(b" ", 2)[1])
+        headers: dict[str, str] = {}
+        while True:
+            line = response.readline().decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = response.read(int(headers.get("content-length", 0)))
+
+    if status != 200:
+        raise HTTPError(status, body.decode("utf-8", "replace").strip())
+    return body
@@ -0,0 +1,79 @@
+"""Splitting large components into tiles of bounded size.
+
+A ``drilled_rows`` range covering a 1000 by 1000 cell panel is a single
+component, and so a single handler call emitting a million holes.
+``iter_tiles`` splits such components into bands of whole rows (or
+columns) holding at most ``tile_size`` holes each; every band is run by
+its own plan step, which gives the build somewhere to report progress
+and spill buffered output between them.  A band's ``offset`` keeps the
+ids of its buses and holes those of the untiled component, so the
+output does not change.
+"""
+import dataclasses
+from typing import Any, Iterator
+
+from .grid import CellRange
+from .model import Columns, Line, Rows
+
+
+#: Holes per tile unless configured otherwise.
+DEFAULT_TILE_SIZE = 65536
+
+
+def get_extent(cells: CellRange) -> tuple[int, int]:
+    """The number of columns and rows ``cells`` covers."""
+    return abs(cells.end_x - cells.start_x) + 1, abs(cells.end_y - cells.start_y) + 1
+
+
+def count_holes(component: Any) -> int:
+    """The number of holes the handler of ``component`` emits.
+
+    Groups emit none of their own, and components of third-party types
+    are counted as none.
+    """
+    if isinstance(component, (Line, Rows, Columns)):
+        columns, rows = get_extent(component.cells)
+        return columns * rows
+    return 0
+
+
+def iter_tiles(component: Any, tile_size: int) -> Iterator[Any]:
+    """Yield ``component`` split into tiles of at most ``tile_size`` holes.
+
+    Only ``Rows`` and ``Columns`` are split, and never within a row or
+    column; anything else is yielded whole.
+
+    >>> rows = Rows("r", "A1:C4", CellRange(0, 1, 2, 4))
+    >>> for tile in iter_tiles(rows, 6):
+    ...     print(tile.cells, tile.offset)
+    CellRange(start_x=0, start_y=1, end_x=2, end_y=2) 0
+    CellRange(start_x=0, start_y=3, end_x=2, end_y=4) 2
+    """
+    if not isinstance(component, (Rows, Columns)):
+        yield component
+        return
+
+    cells = component.cells
+    columns, rows = get_extent(cells)
+    if isinstance(component, Rows):
+        length, count = columns, rows
+    else:
+        length, count = rows, columns
+    if length * count <= tile_size:
+        yield component
+        return
+
+    # Handlers emit rows and columns from the lowest index up, whichever
+    # way round the range was written.
+    first_x = min(cells.start_x, cells.end_x)
+    first_y = min(cells.start_y, cells.end_y)
+    step = max(1, tile_size // length)
+    for offset in range(0, count, step):
+        last = min(offset + step, count) - 1
+        if isinstance(component, Rows):
+            tile_cells = cells._replace(start_y=first_y + offset, end_y=first_y + last)
+        else:
+            tile_cells = cells._replace(start_x=first_x + offset, end_x=first_x + last)
+        yield dataclasses.replace(
+            component, cells=tile_cells, offset=component.offset + offset
+        )
@@ -1,9 +1,10 @@
 import datetime
 from typing import Any, Protocol, Union, Sequence
 import uuid
-from xml.etree import ElementTree
 
-from pydantic import BaseModel, Field, Extra
+from pydantic import BaseModel, Field, Extra, StrictFloat, StrictInt, StrictStr
+
+from .emitters import PartEmitter
 
 
 CellRangePattern = r"([A-Z]+\d+):([A-Z]+\d+)"
@@ -89,13 +90,32 @@ class BoardSpecification(BaseFritzingStripboardModel):
     board: list[GridDefinition] = Field(default_factory=list)
 
 
+ParameterValue = Union[StrictInt, StrictFloat, StrictStr]
+
+
+class Sweep(BaseFritzingStripboardModel):
+    """Parameters to generate a family of boards from one template.
+
+    Every combination of the ``parameters`` lists is built once for each
+    entry of ``variants``, which sets several parameters together.
+    """
+
+    parameters: dict[str, list[ParameterValue]] = Field(default_factory=dict)
+    variants: list[dict[str, ParameterValue]] = Field(default_factory=list)
+
+
+class BoardFamily(BaseFritzingStripboardModel):
+    """A board specification whose values may refer to ``${parameters}``.
+
+    ``meta`` and ``board`` are only validated once the sweep's values
+    have been substituted, as a ``BoardSpecification`` per variant.
+    """
+
+    sweep: Sweep
+    meta: dict[str, Any]
+    board: list[Any] = Field(default_factory=list)
+
+
 class NodeHandler(Protocol):
-    def __call__(
-        self,
-        svg_element: ElementTree.Element,
-        connectors_element: ElementTree.Element,
-        buses_element: ElementTree.Element,
-        config: Any,
-        **kwargs
-    ) -> None:
+    def __call__(self, emitter: PartEmitter, config: Any, **kwargs) -> Any:
         ...
@@ -0,0 +1,184 @@
+"""Lightweight shape checks for raw board specifications.
+
+``check_specification`` inspects the data loaded from a spec file
+without importing pydantic or building any models, which makes it much
+cheaper to start than ``BoardSpecification.parse_obj``.  It mirrors the
+models in ``types.py`` -- required and unknown fields, value types and
+cell range syntax -- but the full validation still has the final say:
+a spec that passes here can be rejected when the models are built.
+"""
+import datetime
+import re
+from typing import Any, Callable
+
+
+CELL_RANGE_PATTERN = re.compile(r"([A-Z]+\d+):([A-Z]+\d+)")
+
+Check = Callable[[Any], bool]
+
+
+def _is_number(value: Any) -> bool:
+    if isinstance(value, str):
+        try:
+            float(value)
+        except ValueError:
+            return False
+        return True
+    return isinstance(value, (int, float))
+
+
+def _is_text(value: Any) -> bool:
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+
+def _is_bool(value: Any) -> bool:
+    return isinstance(value, (bool, int, str))
+
+
+def _is_date(value: Any) -> bool:
+    return isinstance(value, datetime.date) or _is_text(value)
+
+
+def _is_properties(value: Any) -> bool:
+    return isinstance(value, dict) and all(_is_text(item) for item in value.values())
+
+
+def _is_origin(value: Any) -> bool:
+    return (
+        isinstance(value, (list, tuple))
+        and len(value) == 2
+        and all(_is_number(item) for item in value)
+    )
+
+
+def _is_cell_range(value: Any) -> bool:
+    return isinstance(value, str) and CELL_RANGE_PATTERN.match(value) is not None
+
+
+#: Field name -> (required, check) for each model in ``types.py``.
+BOARD_METADATA_FIELDS: dict[str, tuple[bool, Check]] = {
+    "id": (False, _is_text),
+    "width": (True, _is_number),
+    "height": (True, _is_number),
+    "version": (False, _is_text),
+    "author": (False, _is_text),
+    "title": (True, _is_text),
+    "date": (False, _is_date),
+    "label": (True, _is_text),
+    "properties": (False, _is_properties),
+    "taxonomy": (False, _is_text),
+    "description": (False, _is_text),
+}
+
+GRID_METADATA_FIELDS: dict[str, tuple[bool, Check]] = {
+    "origin": (False, _is_origin),
+    "pitch": (False, _is_number),
+    "back": (False, _is_bool),
+}
+
+#: The field that identifies each kind of grid component.
+COMPONENT_FIELDS = ("drilled", "bus", "drilled_rows", "drilled_columns", "shared_bus")
+
+
+def _check_mapping(
+    value: Any, path: str, fields: dict[str, tuple[bool, Check]], errors: list[str]
+) -> None:
+    if not isinstance(value, dict):
+        errors.append(f"{path}: expected a mapping")
+        return
+
+    for name, (required, check) in fields.items():
+        if name not in value:
+            if required:
+                errors.append(f"{path}.{name}: field required")
+        elif not check(value[name]):
+            errors.append(f"{path}.{name}: invalid value {value[name]!r}")
+
+    for name in value:
+        if name not in fields:
+            errors.append(f"{path}.{name}: extra fields not permitted")
+
+
+def _check_components(value: Any, path: str, errors: list[str]) -> None:
+    if not isinstance(value, list):
+        errors.append(f"{path}: expected a list")
+        return
+
+    for index, component in enumerate(value):
+        component_path = f"{path}[{index}]"
+        if not isinstance(component, dict):
+            errors.append(f"{component_path}: expected a mapping")
+            continue
+
+        kinds = [name for name in COMPONENT_FIELDS if name in component]
+        if len(kinds) != 1:
+            errors.append(
+                f"{component_path}: expected exactly one of "
+                + ", ".join(COMPONENT_FIELDS)
+            )
+            continue
+
+        kind = kinds[0]
+        if kind == "shared_bus":
+            _check_components(component[kind], f"{component_path}.{kind}", errors)
+        elif not _is_cell_range(component[kind]):
+            errors.append(
+                f"{component_path}.{kind}: invalid cell range {component[kind]!r}"
+            )
+
+        if "id" in component and not _is_text(component["id"]):
+            errors.append(f"{component_path}.id: invalid value {component['id']!r}")
+        for name in component:
+            if name not in (kind, "id"):
+                errors.append(f"{component_path}.{name}: extra fields not permitted")
+
+
+def _check_board(value: Any, path: str, errors: list[str]) -> None:
+    if not isinstance(value, list):
+        errors.append(f"{path}: expected a list")
+        return
+
+    for index, definition in enumerate(value):
+        definition_path = f"{path}[{index}]"
+        if not isinstance(definition, dict) or set(definition) != {"grid"}:
+            errors.append(f"{definition_path}: expected a mapping with only 'grid'")
+            continue
+
+        grid = definition["grid"]
+        grid_path = f"{definition_path}.grid"
+        if not isinstance(grid, dict):
+            errors.append(f"{grid_path}: expected a mapping")
+            continue
+
+        if "meta" in grid:
+            _check_mapping(
+                grid["meta"], f"{grid_path}.meta", GRID_METADATA_FIELDS, errors
+            )
+        if "components" in grid:
+            _check_components(grid["components"], f"{grid_path}.components", errors)
+        for name in grid:
+            if name not in ("meta", "components"):
+                errors.append(f"{grid_path}.{name}: extra fields not permitted")
+
+
+def check_specification(data: Any) -> list[str]:
+    """List every problem with the shape of a raw board specification.
+
+    >>> check_specification({"meta": {"width": 1, "height": 1}, "board": []})
+    ['meta.title: field required', 'meta.label: field required']
+    """
+    if not isinstance(data, dict):
+        return ["expected a mapping"]
+
+    errors: list[str] = []
+    if "meta" not in data:
+        errors.append("meta: field required")
+    else:
+        _check_mapping(data["meta"], "meta", BOARD_METADATA_FIELDS, errors)
+    if "board" in data:
+        _check_board(data["board"], "board", errors)
+    for name in data:
+        if name not in ("meta", "board"):
+            errors.append(f"{name}: extra fields not permitted")
+
+    return errors
@@ -0,0 +1,179 @@
+import collections
+import io
+import os
+import sys
+import time
+from typing import Callable, NamedTuple, Optional
+import zipfile
+
+from .cache import get_model_key
+from .emitters import SvgFormat
+from .loader import load_specification
+from .model import GridGeometry, convert_component, convert_grid_meta
+from .types import BoardSpecification
+from .zip import (
+    VIEWS,
+    compile_plan,
+    create_view_emitter,
+    run_plan,
+    write_part_entries,
+)
+
+
+DEFAULT_INTERVAL = 0.5
+
+
+class Fragment(NamedTuple):
+    svgs: dict[str, bytes]
+    connectors: bytes
+    buses: bytes
+    connector_count: int
+    bus_count: int
+
+
+def build_fragment(
+    component, meta: GridGeometry, svg_format: Optional[SvgFormat] = None
+) -> Fragment:
+    svgs = {view: io.BytesIO() for view in VIEWS}
+    connectors = io.BytesIO()
+    buses = io.BytesIO()
+
+    emitter = create_view_emitter(svgs, connectors, buses, svg_format)
+    run_plan(compile_plan([(convert_component(component), meta)]), emitter)
+    emitter.close()
+
+    return Fragment(
+        svgs={view: svg.getvalue() for view, svg in svgs.items()},
+        connectors=connectors.getvalue(),
+        buses=buses.getvalue(),
+        connector_count=emitter.connector_count,
+        bus_count=emitter.bus_count,
+    )
+
+
+class IncrementalBuilder:
+    """Rebuilds only the grid components that changed since the last build.
+
+    Every component's serialized output is kept between builds, keyed by
+    the component's validated model and its grid's metadata.  Components
+    whose ``id`` was not set explicitly get a fresh random id each time
+    the spec is loaded, so unset ids are ignored when comparing models
+    and reused fragments keep the ids they were first built with.
+
+    ``svg_format``, ``compression`` and ``compresslevel`` are used for
+    every build, as by ``build_zip``.
+    """
+
+    def __init__(
+        self,
+        svg_format: Optional[SvgFormat] = None,
+        compression: int = zipfile.ZIP_STORED,
+        compresslevel: Optional[int] = None,
+    ):
+        self.svg_format = svg_format
+        self.compression = compression
+        self.compresslevel = compresslevel
+        self._fragments: dict[tuple[str, int], Fragment] = {}
+        self._module_id: Optional[str] = None
+
+    def build(self, board: BoardSpecification, path: str) -> tuple[int, int]:
+        """Write ``board`` to ``path``; returns (rebuilt, total) components."""
+        if "id" not in board.meta.__fields_set__ and self._module_id is not None:
+            board.meta.id = self._module_id
+        self._module_id = board.meta.id
+
+        fragments: dict[tuple[str, int], Fragment] = {}
+        occurrences: collections.Counter = collections.Counter()
+        rebuilt = 0
+
+        for grid_definition in board.board:
+            grid = grid_definition.grid
+            grid_key = get_model_key(grid.meta)
+            meta = convert_grid_meta(grid.meta)
+
+            for component in grid.components:
+                component_key = get_model_key(
+                    {"grid": grid_key, "component": component}
+                )
+                key = (component_key, occurrences[component_key])
+                occurrences[component_key] += 1
+
+                fragment = self._fragments.get(key)
+                if fragment is None:
+                    fragment = build_fragment(component, meta, self.svg_format)
+                    rebuilt += 1
+                fragments[key] = fragment
+
+        self._fragments = fragments
+
+        temporary_path = f"{path}.tmp"
+        with zipfile.ZipFile(
+            temporary_path,
+            mode="w",
+            compression=self.compression,
+            compresslevel=self.compresslevel,
+        ) as archive:
+            write_part_entries(
+                board,
+                archive,
+                {
+                    view: io.BytesIO(b"".join(f.svgs[view] for f in fragments.values()))
+                    for view in VIEWS
+                },
+                io.BytesIO(b"".join(f.connectors for f in fragments.values())),
+                io.BytesIO(b"".join(f.buses for f in fragments.values())),
+                sum(f.connector_count for f in fragments.values()),
+                sum(f.bus_count for f in fragments.values()),
+                self.svg_format,
+            )
+        os.replace(temporary_path, path)
+
+        return rebuilt, len(fragments)
+
+
+def _get_signature(path: str) -> Optional[tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def watch(
+    spec_path: str,
+    output: str,
+    interval: float = DEFAULT_INTERVAL,
+    check: Optional[Callable[[BoardSpecification], None]] = None,
+    **kwargs,
+) -> None:
+    """Rebuild ``output`` whenever ``spec_path`` changes, until interrupted.
+
+    ``check``, if given, is called with every spec loaded before it is
+    built; ``kwargs`` are passed to ``IncrementalBuilder``.
+    """
+    builder = IncrementalBuilder(**kwargs)
+    signature: Optional[tuple[int, int]] = None
+
+    try:
+        while True:
+            current = _get_signature(spec_path)
+            if current is not None and current != signature:
+                signature = current
+                started = time.perf_counter()
+                try:
+                    with open(spec_path, "r") as inf:
+                        loaded = load_specification(inf)
+                    if check is not None:
+                        check(loaded)
+                    rebuilt, total = builder.build(loaded, output)
+                except Exception as exc:
+                    print(f"{spec_path}: {type(exc).__name__}: {exc}", file=sys.stderr)
+                else:
+                    print(
+                        f"Rebuilt {output} in {time.perf_counter() - started:.3f}s "
+                        f"({rebuilt} of {total} components changed)",
+                        file=sys.stderr,
+                    )
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
@@ -1,397 +1,514 @@
+import contextlib
+import functools
+import io
+import shutil
+import tempfile
 from xml.etree import ElementTree
-from typing import Type
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
 import zipfile
 
-from pydantic import BaseModel
-
+from .cache import BuildCache
+from .emitters import (
+    EXTRA_VIEWS,
+    PartEmitter,
+    TemplateEmitter,
+    SvgFormat,
+    TeeEmitter,
+    TreeEmitter,
+    close_tag,
+)
 from .grid import (
     InvalidCellRange,
-    convert_cell_to_coordinate,
+    RangeTable,
     convert_coordinate_to_position,
-    get_drill_positions_between_coordinates,
-)
-from .types import (
-    BoardSpecification,
-    NodeHandler,
-    GridDefinition,
-    SharedBus,
-    XYBus,
-    XYDrilledBus,
-    XYDrilledBusColumns,
-    XYDrilledBusRows,
-    GridDefinitionData,
+    get_axis_positions,
+    get_cell_range_string,
+    get_drill_position_arrays,
+    parse_cell_range,
+    walk_components,
 )
+from .ir import BoardIR
+from .model import Board, Columns, Grid, GridGeometry, Group, Line, Rows, convert_board
+from .nets import NetEmitter, build_nets
+from .occupancy import MergingEmitter, get_contested_positions
+from .profiling import get_active_profiler, phase
+from .progress import ProgressMonitor
+from .tiles import count_holes, iter_tiles
+from .types import BoardSpecification, NodeHandler
 
 
-HANDLER_REGISTRY: dict[Type[BaseModel], NodeHandler] = {}
+#: Handler for each type of model component.  Third-party component
+#: types are added with ``register_handler``, either directly or from a
+#: module named by an entry point in ``HANDLER_ENTRY_POINT_GROUP``.
+HANDLER_REGISTRY: dict[type, NodeHandler] = {}
+
+HANDLER_ENTRY_POINT_GROUP = "fritzing_stripboard.handlers"
+
+#: ``PlanStep.bus`` and ``PlanStep.slot`` value meaning "none".
+NO_SLOT = -1
 
 
 class NodeTypeNotImplemented(Exception):
     pass
 
 
-def get_handler(component: BaseModel) -> NodeHandler:
-    handlers: dict[Type[BaseModel], NodeHandler] = {
-        GridDefinition: handle_grid_definition,
-        XYDrilledBus: handle_xy_drilled_bus,
-        XYDrilledBusColumns: handle_xy_drilled_bus_columns,
-        XYDrilledBusRows: handle_xy_drilled_bus_rows,
-        XYBus: handle_xy_bus,
-        SharedBus: handle_shared_bus,
-    }
+def register_handler(component_type: type) -> Callable[[NodeHandler], NodeHandler]:
+    """Register the decorated function as the handler for ``component_type``."""
+
+    def decorator(handler: NodeHandler) -> NodeHandler:
+        HANDLER_REGISTRY[component_type] = handler
+        return handler
+
+    return decorator
+
+
+@functools.lru_cache(maxsize=None)
+def load_handler_plugins() -> None:
+    """Import every module registered under ``HANDLER_ENTRY_POINT_GROUP``."""
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=HANDLER_ENTRY_POINT_GROUP):
+        entry_point.load()
+
 
+def get_handler(component: Any) -> NodeHandler:
     try:
-        return handlers[type(component)]
+        return HANDLER_REGISTRY[type(component)]
+    except KeyError:
+        pass
+
+    load_handler_plugins()
+    try:
+        return HANDLER_REGISTRY[type(component)]
     except KeyError as exc:
         raise NodeTypeNotImplemented(component) from exc
 
 
-def handle_shared_bus(
-    svg_element: ElementTree.Element,
-    connectors_element: ElementTree.Element,
-    buses_element: ElementTree.Element,
-    config: SharedBus,
-    **kwargs,
-) -> None:
-    bus = kwargs.get(
-        "bus",
-        ElementTree.SubElement(buses_element, "bus", attrib={"id": str(config.id)}),
-    )
+class PlanStep(NamedTuple):
+    handler: NodeHandler
+    component: Any
+    meta: GridGeometry
+    #: Slot holding the bus the component joins.
+    bus: int
+    #: Slot receiving the handler's return value, the bus of a group.
+    slot: int
 
-    for item in config.shared_bus:
-        handler = get_handler(item)
-        handler(svg_element, connectors_element, buses_element, item, bus=bus, **kwargs)
 
+class ExecutionPlan(NamedTuple):
+    steps: list[PlanStep]
+    slot_count: int
 
-def handle_xy_drilled_bus_rows(
-    svg_element: ElementTree.Element,
-    connectors_element: ElementTree.Element,
-    buses_element: ElementTree.Element,
-    config: XYDrilledBusRows,
-    **kwargs,
-) -> None:
-    item = config
-    grid: GridDefinitionData = kwargs["grid"]
 
-    start, end = item.drilled_rows.split(":")
+def compile_plan(
+    components: Iterable[tuple[Any, GridGeometry]], tile_size: Optional[int] = None
+) -> ExecutionPlan:
+    """Resolve the handler and bus of every component ahead of time.
 
-    start_coord_x, start_coord_y = convert_cell_to_coordinate(start)
-    end_coord_x, end_coord_y = convert_cell_to_coordinate(end)
+    ``shared_bus`` groups are flattened: each records the bus its handler
+    returns in a slot, which its members then read, so running the plan
+    needs neither recursion nor handler lookups.  When profiling, every
+    handler is wrapped once here, at the depth it was nested.  With
+    ``tile_size``, large components are run as several steps of at most
+    that many holes; see ``tiles.py``.
 
-    y_offset = min(start_coord_y, end_coord_y)
-    for y in range(abs(end_coord_y - start_coord_y) + 1):
-        bus = kwargs.get(
-            "bus",
-            ElementTree.SubElement(
-                buses_element, "bus", attrib={"id": f"{item.id}-{y}"}
-            ),
-        )
+    >>> plan = compile_plan([(Group("g", (Line("l", "A1:A2", None, True),)), None)])
+    >>> [(step.handler.__name__, step.bus, step.slot) for step in plan.steps]
+    [('handle_shared_bus', -1, 0), ('handle_xy_drilled_bus', 0, -1)]
+    """
+    steps: list[PlanStep] = []
+    slot_count = 0
+    profiler = get_active_profiler()
 
-        line_start_position = convert_coordinate_to_position(
-            (start_coord_x, y + y_offset),
-            grid_meta=grid.meta,
-        )
-        line_end_position = convert_coordinate_to_position(
-            (end_coord_x, y + y_offset),
-            grid_meta=grid.meta,
-        )
-        line_connector_id = f"{item.id}-{y}-trace"
-        ElementTree.SubElement(
-            svg_element,
-            "line",
-            attrib={
-                "id": line_connector_id,
-                "x1": f"{line_start_position[0]}mm",
-                "y1": f"{line_start_position[1]}mm",
-                "x2": f"{line_end_position[0]}mm",
-                "y2": f"{line_end_position[1]}mm",
-                "stroke": "brown",
-                "stroke-width": "1.5mm",
-                "style": "stroke-linecap:round; stroke-opacity: 0.5;",
-            },
-        )
+    def add(component: Any, meta: GridGeometry, bus: int, depth: int) -> None:
+        nonlocal slot_count
 
-        for idx, (drill_x, drill_y) in enumerate(
-            get_drill_positions_between_coordinates(
-                (start_coord_x, y + y_offset),
-                (end_coord_x, y + y_offset),
-                grid_meta=grid.meta,
-            )
-        ):
-            connector_id = f"{item.id}-{y}-{idx}"
+        handler = get_handler(component)
+        if profiler is not None:
+            handler = profiler.wrap_handler(handler, component, depth)
 
-            ElementTree.SubElement(
-                svg_element,
-                "circle",
-                attrib={
-                    "id": connector_id,
-                    "cx": f"{drill_x}mm",
-                    "cy": f"{drill_y}mm",
-                    "r": "0.5mm",
-                    "stroke-width": "0.35mm",
-                    "stroke": "brown",
-                    "fill": "none",
-                },
-            )
+        if not isinstance(component, Group):
+            if tile_size is None:
+                steps.append(PlanStep(handler, component, meta, bus, NO_SLOT))
+                return
+            for tile in iter_tiles(component, tile_size):
+                steps.append(PlanStep(handler, tile, meta, bus, NO_SLOT))
+            return
 
-            ElementTree.SubElement(
-                bus,
-                "nodeMember",
-                attrib={"connectorId": connector_id},
-            )
+        slot = slot_count
+        slot_count += 1
+        steps.append(PlanStep(handler, component, meta, bus, slot))
+        for member in component.members:
+            add(member, meta, slot, depth + 1)
 
-            connector = ElementTree.SubElement(
-                connectors_element,
-                "connector",
-                attrib={
-                    "type": "female",
-                    "name": connector_id,
-                    "id": connector_id,
-                },
-            )
-            connector_views = ElementTree.SubElement(connector, "views")
-            connector_breadboard_view = ElementTree.SubElement(
-                connector_views, "breadboardView"
-            )
-            ElementTree.SubElement(
-                connector_breadboard_view,
-                "p",
-                attrib={"layer": "breadboard", "svgId": connector_id},
-            )
+    for component, meta in components:
+        add(component, meta, NO_SLOT, 0)
 
+    return ExecutionPlan(steps, slot_count)
 
-def handle_xy_drilled_bus_columns(
-    svg_element: ElementTree.Element,
-    connectors_element: ElementTree.Element,
-    buses_element: ElementTree.Element,
-    config: XYDrilledBusColumns,
-    **kwargs,
+
+def get_grid_components(grids: Iterable[Grid]) -> Iterator[tuple[Any, GridGeometry]]:
+    for grid in grids:
+        for component in grid.components:
+            yield component, grid.meta
+
+
+def run_plan(
+    plan: ExecutionPlan,
+    emitter: PartEmitter,
+    progress: Optional[ProgressMonitor] = None,
 ) -> None:
-    item = config
-    grid: GridDefinitionData = kwargs["grid"]
+    """Run every step of ``plan`` into ``emitter``.
 
-    start, end = item.drilled_columns.split(":")
+    ``progress``, if given, is advanced by each step's holes as it ends.
+    """
+    buses: list[Any] = [None] * plan.slot_count
+    if progress is not None:
+        progress.start(sum(count_holes(step.component) for step in plan.steps))
 
-    start_coord_x, start_coord_y = convert_cell_to_coordinate(start)
-    end_coord_x, end_coord_y = convert_cell_to_coordinate(end)
+    for handler, component, meta, bus, slot in plan.steps:
+        if bus == NO_SLOT:
+            result = handler(emitter, component, meta=meta)
+        else:
+            result = handler(emitter, component, meta=meta, bus=buses[bus])
+        if slot != NO_SLOT:
+            buses[slot] = result
+        if progress is not None:
+            progress.advance(count_holes(component))
 
-    x_offset = min(start_coord_x, end_coord_x)
-    for x in range(abs(end_coord_x - start_coord_x) + 1):
-        bus = kwargs.get(
-            "bus",
-            ElementTree.SubElement(
-                buses_element, "bus", attrib={"id": f"{item.id}-{x}"}
-            ),
-        )
+    if progress is not None:
+        progress.finish()
 
-        line_start_position = convert_coordinate_to_position(
-            (x + x_offset, start_coord_y),
-            grid_meta=grid.meta,
-        )
-        line_end_position = convert_coordinate_to_position(
-            (x + x_offset, end_coord_y),
-            grid_meta=grid.meta,
-        )
-        line_connector_id = f"{item.id}-{x}-trace"
-        ElementTree.SubElement(
-            svg_element,
-            "line",
-            attrib={
-                "id": line_connector_id,
-                "x1": f"{line_start_position[0]}mm",
-                "y1": f"{line_start_position[1]}mm",
-                "x2": f"{line_end_position[0]}mm",
-                "y2": f"{line_end_position[1]}mm",
-                "stroke": "brown",
-                "stroke-width": "1.5mm",
-                "style": "stroke-linecap:round; stroke-opacity: 0.5;",
-            },
-        )
 
-        for idx, (drill_x, drill_y) in enumerate(
-            get_drill_positions_between_coordinates(
-                (x + x_offset, start_coord_y),
-                (x + x_offset, end_coord_y),
-                grid_meta=grid.meta,
-            )
-        ):
-            connector_id = f"{item.id}-{x}-{idx}"
-
-            ElementTree.SubElement(
-                svg_element,
-                "circle",
-                attrib={
-                    "id": connector_id,
-                    "cx": f"{drill_x}mm",
-                    "cy": f"{drill_y}mm",
-                    "r": "0.5mm",
-                    "stroke-width": "0.35mm",
-                    "stroke": "brown",
-                    "fill": "none",
-                },
-            )
+def compile_cell_ranges(board: BoardSpecification) -> RangeTable:
+    """Parse every cell range used by ``board`` exactly once."""
+    ranges: RangeTable = {}
 
-            connector_id = f"{item.id}-{idx}"
-            ElementTree.SubElement(
-                bus,
-                "nodeMember",
-                attrib={"connectorId": connector_id},
-            )
+    for grid_definition in board.board:
+        for component in walk_components(grid_definition.grid.components):
+            cell_range = get_cell_range_string(component)
+            if cell_range is not None and cell_range not in ranges:
+                ranges[cell_range] = parse_cell_range(cell_range)
 
-            connector = ElementTree.SubElement(
-                connectors_element,
-                "connector",
-                attrib={
-                    "type": "female",
-                    "name": connector_id,
-                    "id": connector_id,
-                },
-            )
-            connector_views = ElementTree.SubElement(connector, "views")
-            connector_breadboard_view = ElementTree.SubElement(
-                connector_views, "breadboardView"
-            )
-            ElementTree.SubElement(
-                connector_breadboard_view,
-                "p",
-                attrib={"layer": "breadboard", "svgId": connector_id},
-            )
+    return ranges
 
 
-def handle_xy_bus(
-    svg_element: ElementTree.Element,
-    connectors_element: ElementTree.Element,
-    buses_element: ElementTree.Element,
-    config: XYBus,
+@register_handler(Group)
+def handle_shared_bus(
+    emitter: PartEmitter,
+    config: Group,
+    **kwargs,
+) -> Any:
+    # Members are run by the plan, which passes them the returned bus.
+    return kwargs.get("bus", emitter.add_bus(config.id))
+
+
+@register_handler(Rows)
+def handle_xy_drilled_bus_rows(
+    emitter: PartEmitter,
+    config: Rows,
     **kwargs,
 ) -> None:
-    handle_xy_drilled_bus(
-        svg_element, connectors_element, buses_element, config, drilled=False, **kwargs
-    )
+    item = config
+    meta: GridGeometry = kwargs["meta"]
 
+    start_coord_x, start_coord_y, end_coord_x, end_coord_y = item.cells
 
-def handle_xy_drilled_bus(
-    svg_element: ElementTree.Element,
-    connectors_element: ElementTree.Element,
-    buses_element: ElementTree.Element,
-    config: XYDrilledBus | XYBus,
+    x_offset = min(start_coord_x, end_coord_x)
+    columns = get_axis_positions(start_coord_x, end_coord_x, meta, axis=0)
+    rows = get_axis_positions(start_coord_y, end_coord_y, meta, axis=1)
+    line_start_x = columns[start_coord_x - x_offset]
+    line_end_x = columns[end_coord_x - x_offset]
+
+    for y, row_position in enumerate(rows, item.offset):
+        bus = kwargs.get("bus", emitter.add_bus(f"{item.id}-{y}"))
+
+        emitter.add_line(
+            f"{item.id}-{y}-trace",
+            (line_start_x, row_position),
+            (line_end_x, row_position),
+        )
+
+        for idx, column_position in enumerate(columns):
+            connector_id = f"{item.id}-{y}-{idx}"
+            emitter.add_hole(
+                connector_id, connector_id, (column_position, row_position), bus
+            )
+
+
+@register_handler(Columns)
+def handle_xy_drilled_bus_columns(
+    emitter: PartEmitter,
+    config: Columns,
     **kwargs,
 ) -> None:
     item = config
+    meta: GridGeometry = kwargs["meta"]
 
-    if isinstance(config, XYDrilledBus):
-        cell_range = config.drilled
-    elif isinstance(config, XYBus):
-        cell_range = config.bus
-    else:
-        raise NotImplementedError(config)
+    start_coord_x, start_coord_y, end_coord_x, end_coord_y = item.cells
+
+    y_offset = min(start_coord_y, end_coord_y)
+    columns = get_axis_positions(start_coord_x, end_coord_x, meta, axis=0)
+    rows = get_axis_positions(start_coord_y, end_coord_y, meta, axis=1)
+    line_start_y = rows[start_coord_y - y_offset]
+    line_end_y = rows[end_coord_y - y_offset]
+
+    for x, column_position in enumerate(columns, item.offset):
+        bus = kwargs.get("bus", emitter.add_bus(f"{item.id}-{x}"))
+
+        emitter.add_line(
+            f"{item.id}-{x}-trace",
+            (column_position, line_start_y),
+            (column_position, line_end_y),
+        )
+
+        for idx, row_position in enumerate(rows):
+            emitter.add_hole(
+                f"{item.id}-{x}-{idx}",
+                f"{item.id}-{idx}",
+                (column_position, row_position),
+                bus,
+            )
 
-    grid: GridDefinitionData = kwargs["grid"]
-    drilled: bool = kwargs.get("drilled", True)
 
-    start, end = cell_range.split(":")
+@register_handler(Line)
+def handle_xy_drilled_bus(
+    emitter: PartEmitter,
+    config: Line,
+    **kwargs,
+) -> None:
+    item = config
+    meta: GridGeometry = kwargs["meta"]
 
-    start_coord_x, start_coord_y = convert_cell_to_coordinate(start)
-    end_coord_x, end_coord_y = convert_cell_to_coordinate(end)
-    start_x, start_y = convert_coordinate_to_position(
+    start_coord_x, start_coord_y, end_coord_x, end_coord_y = item.cells
+    start_position = convert_coordinate_to_position(
         (start_coord_x, start_coord_y),
-        grid_meta=grid.meta,
+        grid_meta=meta,
     )
-    end_x, end_y = convert_coordinate_to_position(
+    end_position = convert_coordinate_to_position(
         (end_coord_x, end_coord_y),
-        grid_meta=grid.meta,
+        grid_meta=meta,
     )
+    start_x, start_y = start_position
+    end_x, end_y = end_position
 
     if not (start_x == end_x or end_y == start_y):
-        raise InvalidCellRange(cell_range)
+        raise InvalidCellRange(item.cell_range)
 
-    bus = kwargs.get(
-        "bus", ElementTree.SubElement(buses_element, "bus", attrib={"id": str(item.id)})
-    )
+    bus = kwargs.get("bus", emitter.add_bus(item.id))
 
-    line_connector_id = f"{item.id}-trace"
-    ElementTree.SubElement(
-        svg_element,
-        "line",
-        attrib={
-            "id": line_connector_id,
-            "x1": f"{start_x}mm",
-            "y1": f"{start_y}mm",
-            "x2": f"{end_x}mm",
-            "y2": f"{end_y}mm",
-            "stroke": "brown",
-            "stroke-width": "1.5mm",
-            "style": "stroke-linecap:round; stroke-opacity: 0.5;",
-        },
-    )
+    emitter.add_line(f"{item.id}-trace", start_position, end_position)
 
-    for idx, (drill_x, drill_y) in enumerate(
-        get_drill_positions_between_coordinates(
-            (start_coord_x, start_coord_y),
-            (end_coord_x, end_coord_y),
-            grid_meta=grid.meta,
+    drill_xs, drill_ys = get_drill_position_arrays(
+        (start_coord_x, start_coord_y),
+        (end_coord_x, end_coord_y),
+        grid_meta=meta,
+    )
+    for idx, position in enumerate(zip(drill_xs, drill_ys)):
+        connector_id = f"{item.id}-{idx}"
+        emitter.add_hole(
+            connector_id, connector_id, position, bus, drilled=item.drilled
         )
+
+
+def emit_board(
+    board: BoardSpecification,
+    emitter: PartEmitter,
+    merge_overlaps: bool = False,
+    merge_nets: bool = False,
+    workers: Optional[int] = 1,
+    tile_size: Optional[int] = None,
+    progress: Optional[ProgressMonitor] = None,
+    holes: Optional[BoardIR] = None,
+) -> None:
+    """Run every component's handler into ``emitter``.
+
+    With ``merge_overlaps``, holes that several components place on the
+    same cell of a grid are emitted once; see ``MergingEmitter``.  With
+    ``merge_nets``, buses that share a cell are emitted as a single bus;
+    see ``NetEmitter``.  With ``workers`` other than 1, each grid is
+    compiled by a process pool and the results are replayed into
+    ``emitter`` in grid order; see ``map_grids``.  ``tile_size`` and
+    ``progress`` are passed to ``compile_plan`` and ``run_plan``; either
+    keeps every grid in this process.  Every hole the handlers place is
+    also recorded into ``holes``, if given, before any merging, so that
+    each keeps its own bus; see ``exports``.
+    Handlers are run on the ``model.Board`` converted from ``board``.
+    """
+    model = convert_board(board)
+    net_emitter: Optional[NetEmitter] = None
+    if merge_overlaps or merge_nets:
+        ranges = compile_cell_ranges(board)
+    if merge_nets:
+        emitter = net_emitter = NetEmitter(emitter, build_nets(board, ranges))
+    if merge_overlaps:
+        emitter = MergingEmitter(emitter, get_contested_positions(board, ranges))
+    if holes is not None:
+        emitter = TeeEmitter(emitter, holes)
+
+    if (
+        tile_size is None
+        and progress is None
+        and use_grid_workers(model.grids, workers)
     ):
-        connector_id = f"{item.id}-{idx}"
+        for fragment in map_grids(compile_grid, model, workers):
+            fragment.replay(emitter)
+    else:
+        plan = compile_plan(get_grid_components(model.grids), tile_size=tile_size)
+        run_plan(plan, emitter, progress=progress)
 
-        ElementTree.SubElement(
-            svg_element,
-            "circle",
-            attrib={
-                "id": connector_id,
-                "cx": f"{drill_x}mm",
-                "cy": f"{drill_y}mm",
-                "r": "0.5mm" if drilled else "0.1mm",
-                "stroke-width": "0.35mm" if drilled else "0.1mm",
-                "stroke": "brown",
-                "fill": "none",
-            },
-        )
+    if net_emitter is not None:
+        net_emitter.flush()
 
-        ElementTree.SubElement(
-            bus,
-            "nodeMember",
-            attrib={"connectorId": connector_id},
-        )
 
-        connector = ElementTree.SubElement(
-            connectors_element,
-            "connector",
-            attrib={
-                "type": "female" if drilled else "pad",
-                "name": connector_id,
-                "id": connector_id,
-            },
-        )
-        connector_views = ElementTree.SubElement(connector, "views")
-        connector_breadboard_view = ElementTree.SubElement(
-            connector_views, "breadboardView"
-        )
-        ElementTree.SubElement(
-            connector_breadboard_view,
-            "p",
-            attrib={"layer": "breadboard", "svgId": connector_id},
+def compile_board(
+    board: BoardSpecification,
+    merge_overlaps: bool = False,
+    merge_nets: bool = False,
+    workers: Optional[int] = 1,
+    tile_size: Optional[int] = None,
+    progress: Optional[ProgressMonitor] = None,
+    holes: Optional[BoardIR] = None,
+) -> BoardIR:
+    """Run every handler into a ``BoardIR`` without building any XML.
+
+    Grids compiled by separate ``workers`` are joined with
+    ``BoardIR.extend`` unless merging needs to see every grid's holes;
+    see ``emit_board`` for ``tile_size``, ``progress`` and ``holes``.
+    """
+    ir = BoardIR()
+    if (
+        merge_overlaps
+        or merge_nets
+        or tile_size is not None
+        or progress is not None
+        or not use_grid_workers(board.board, workers)
+    ):
+        emit_board(
+            board,
+            ir,
+            merge_overlaps=merge_overlaps,
+            merge_nets=merge_nets,
+            workers=workers,
+            tile_size=tile_size,
+            progress=progress,
+            holes=holes,
         )
+        return ir
+
+    for fragment in map_grids(compile_grid, convert_board(board), workers):
+        ir.extend(fragment)
+        if holes is not None:
+            holes.extend(fragment)
+    return ir
+
+
+class GridFragment(NamedTuple):
+    """One grid's elements, serialized by a ``TemplateEmitter``."""
+
+    #: The SVG elements of each of ``VIEWS``.
+    svgs: dict[str, bytes]
+    connectors: bytes
+    buses: bytes
+    connector_count: int
+    bus_count: int
+    saved_bytes: int
+
+
+def compile_grid(grid: Grid) -> BoardIR:
+    """Run one grid's handlers into a ``BoardIR`` of its own."""
+    ir = BoardIR()
+    run_plan(compile_plan(get_grid_components([grid])), ir)
+    return ir
+
+
+def serialize_grid(
+    grid: Grid,
+    svg_precision: Optional[int] = None,
+) -> GridFragment:
+    """Serialize one grid's elements as ``stream_part_files`` would."""
+    svg_files = {view: io.BytesIO() for view in VIEWS}
+    connectors_file = io.BytesIO()
+    buses_file = io.BytesIO()
+    svg_format = SvgFormat(precision=svg_precision)
+
+    emitter = create_view_emitter(svg_files, connectors_file, buses_file, svg_format)
+    run_plan(compile_plan(get_grid_components([grid])), emitter)
+    emitter.close()
+
+    return GridFragment(
+        svgs={view: svg_file.getvalue() for view, svg_file in svg_files.items()},
+        connectors=connectors_file.getvalue(),
+        buses=buses_file.getvalue(),
+        connector_count=emitter.connector_count,
+        bus_count=emitter.bus_count,
+        saved_bytes=svg_format.saved_bytes,
+    )
 
 
-def handle_grid_definition(
-    svg_element: ElementTree.Element,
-    connectors_element: ElementTree.Element,
-    buses_element: ElementTree.Element,
-    config: GridDefinition,
+def use_grid_workers(grids: Sequence[Any], workers: Optional[int]) -> bool:
+    """Whether to build ``grids`` with ``map_grids``.
+
+    Never while a profiler is active: it could not see handlers run in
+    other processes, so its report would be empty.
+    """
+    return workers != 1 and len(grids) > 1 and get_active_profiler() is None
+
+
+def map_grids(
+    function: Callable[..., Any],
+    model: Board,
+    workers: Optional[int],
     **kwargs,
-) -> None:
-    grid = config.grid
+) -> list[Any]:
+    """Call ``function`` on each of ``model``'s grids in a process pool.
 
-    for item in grid.components:
-        handler = get_handler(item)
-        handler(svg_element, connectors_element, buses_element, item, grid=grid)
+    Grids never share buses, so each one can be built on its own; the
+    results are returned in grid order however the workers finish, which
+    keeps the merged output identical to a serial build.  ``workers``
+    defaults to the number of CPUs when ``None``.
+    """
+    from concurrent.futures import ProcessPoolExecutor
 
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(functools.partial(function, **kwargs), model.grids))
 
-def build_part_files(
-    board: BoardSpecification,
-) -> tuple[ElementTree.Element, ElementTree.Element]:
-    svg_root = ElementTree.Element(
+
+#: Every view of the part, each written to its own SVG.
+VIEWS = ("breadboard", *EXTRA_VIEWS)
+
+
+def get_svg_entry_name(board: BoardSpecification, view: str) -> str:
+    return f"svg.{view}.{board.meta.id}.svg"
+
+
+def create_view_emitter(
+    svg_files: dict[str, IO[bytes]],
+    connectors_file: IO[bytes],
+    buses_file: IO[bytes],
+    svg_format: Optional[SvgFormat] = None,
+) -> TemplateEmitter:
+    """A ``TemplateEmitter`` writing every view's SVG from ``svg_files``."""
+    return TemplateEmitter(
+        svg_files["breadboard"],
+        connectors_file,
+        buses_file,
+        svg_format,
+        view_files={view: svg_files[view] for view in EXTRA_VIEWS},
+    )
+
+
+def _build_document_root(board: BoardSpecification) -> ElementTree.Element:
+    return ElementTree.Element(
         "svg",
         attrib={
             "width": f"{board.meta.width}mm",
@@ -399,6 +516,24 @@ def build_part_files(
             "viewBox": f"0 0 {board.meta.width} {board.meta.height}",
         },
     )
+
+
+def _get_outline_path(board: BoardSpecification) -> str:
+    return f"""
+                M0,0
+                L{board.meta.width},0 {board.meta.width},{board.meta.height} 0,{board.meta.height} 0,0
+            """
+
+
+def build_svg_root(
+    board: BoardSpecification,
+    svg_format: Optional[SvgFormat] = None,
+) -> tuple[ElementTree.Element, ElementTree.Element]:
+    svg_root = _build_document_root(board)
+    if svg_format is not None:
+        style = svg_format.get_style_element()
+        if style is not None:
+            svg_root.append(style)
     g = ElementTree.SubElement(svg_root, "g", attrib={"id": "breadboard"})
     ElementTree.SubElement(
         g,
@@ -409,13 +544,62 @@ def build_part_files(
             "stroke": "none",
             "fill": "#deb675",
             "fill-opacity": "1",
-            "d": f"""
-                M0,0
-                L{board.meta.width},0 {board.meta.width},{board.meta.height} 0,{board.meta.height} 0,0
-            """,
+            "d": _get_outline_path(board),
+        },
+    )
+
+    return svg_root, g
+
+
+def build_pcb_root(
+    board: BoardSpecification,
+) -> tuple[ElementTree.Element, ElementTree.Element]:
+    """The PCB view's document and the group its traces and pads go in.
+
+    That group, ``copper1``, is nested in ``copper0``, so every pad is
+    on both copper layers; the board outline is drawn on the silkscreen.
+    """
+    svg_root = _build_document_root(board)
+    silkscreen = ElementTree.SubElement(svg_root, "g", attrib={"id": "silkscreen"})
+    ElementTree.SubElement(
+        silkscreen,
+        "path",
+        attrib={
+            "id": "boardoutline",
+            "stroke": "black",
+            "stroke-width": "0.2",
+            "fill": "none",
+            "d": _get_outline_path(board),
         },
     )
+    copper0 = ElementTree.SubElement(svg_root, "g", attrib={"id": "copper0"})
+    copper1 = ElementTree.SubElement(copper0, "g", attrib={"id": "copper1"})
+
+    return svg_root, copper1
+
+
+def build_schematic_root(
+    board: BoardSpecification,
+) -> tuple[ElementTree.Element, ElementTree.Element]:
+    svg_root = _build_document_root(board)
+    g = ElementTree.SubElement(svg_root, "g", attrib={"id": "schematic"})
 
+    return svg_root, g
+
+
+def build_view_roots(
+    board: BoardSpecification,
+    svg_format: Optional[SvgFormat] = None,
+) -> dict[str, tuple[ElementTree.Element, ElementTree.Element]]:
+    """Every view's document and the group its traces and holes go in."""
+    return {
+        "breadboard": build_svg_root(board, svg_format),
+        "pcb": build_pcb_root(board),
+        "schematic": build_schematic_root(board),
+    }
+
+
+def build_part_root(board: BoardSpecification) -> ElementTree.Element:
     part_root = ElementTree.Element("module", attrib={"moduleId": str(board.meta.id)})
     ElementTree.SubElement(part_root, "version").text = board.meta.version
     ElementTree.SubElement(part_root, "author").text = board.meta.author
@@ -453,33 +637,396 @@ def build_part_files(
 
     schematic_view = ElementTree.SubElement(views, "schematicView")
     layers = ElementTree.SubElement(
-        schematic_view, "layers", attrib={"image": f"breadboard/{board.meta.id}.svg"}
+        schematic_view, "layers", attrib={"image": f"schematic/{board.meta.id}.svg"}
     )
     ElementTree.SubElement(layers, "layer", attrib={"layerId": "schematic"})
 
     pcb_view = ElementTree.SubElement(views, "pcbView")
     layers = ElementTree.SubElement(
-        pcb_view, "layers", attrib={"image": f"breadboard/{board.meta.id}.svg"}
+        pcb_view, "layers", attrib={"image": f"pcb/{board.meta.id}.svg"}
     )
-    ElementTree.SubElement(layers, "layer", attrib={"layerId": "pcb"})
+    for layer in ("copper0", "silkscreen", "copper1"):
+        ElementTree.SubElement(layers, "layer", attrib={"layerId": layer})
+
+    return part_root
+
+
+def build_part_files(
+    board: BoardSpecification,
+    merge_overlaps: bool = False,
+    merge_nets: bool = False,
+    svg_format: Optional[SvgFormat] = None,
+    workers: Optional[int] = 1,
+    holes: Optional[BoardIR] = None,
+    tile_size: Optional[int] = None,
+    progress: Optional[ProgressMonitor] = None,
+    checkpoint: Optional[Callable[[], None]] = None,
+) -> tuple[ElementTree.Element, dict[str, ElementTree.Element]]:
+    """Build the part's fzp document and the SVG document of each view.
+
+    The board is compiled once and every view drawn from the same holes.
+    ``svg_format`` controls how the breadboard view's traces and holes
+    are written; see ``SvgFormat``.  ``workers``, ``tile_size`` and
+    ``progress`` are passed to ``compile_board``, as is ``holes``, which
+    records every hole placed; see ``exports``.  ``checkpoint`` is called
+    while the documents are filled; see ``BoardIR.replay``.
+    """
+    view_roots = build_view_roots(board, svg_format)
+    part_root = build_part_root(board)
 
     connectors = ElementTree.SubElement(part_root, "connectors")
     buses = ElementTree.SubElement(part_root, "buses")
 
-    for component in board.board:
-        handler = get_handler(component)
+    emitter = TreeEmitter(
+        view_roots["breadboard"][1],
+        connectors,
+        buses,
+        svg_format,
+        view_elements={view: view_roots[view][1] for view in EXTRA_VIEWS},
+    )
+    ir = compile_board(
+        board,
+        merge_overlaps=merge_overlaps,
+        merge_nets=merge_nets,
+        workers=workers,
+        tile_size=tile_size,
+        progress=progress,
+        holes=holes,
+    )
+    ir.replay(emitter, checkpoint=checkpoint)
+
+    return part_root, {view: root for view, (root, _) in view_roots.items()}
+
+
+def _write_section(output: IO[bytes], tag: str, body: IO[bytes], count: int) -> None:
+    if not count:
+        output.write(f"<{tag} />".encode("ascii"))
+        return
+
+    output.write(f"<{tag}>".encode("ascii"))
+    shutil.copyfileobj(body, output)
+    output.write(f"</{tag}>".encode("ascii"))
+
 
-        handler(g, connectors, buses, component)
+def _write_svg_document(
+    output: IO[bytes],
+    svg_root: ElementTree.Element,
+    container: ElementTree.Element,
+    body: IO[bytes],
+) -> None:
+    """Write ``svg_root`` with ``body`` as the contents of ``container``."""
+    first = body.read(1)
+    if not first:
+        output.write(ElementTree.tostring(svg_root))
+        return
+
+    placeholder = ElementTree.SubElement(container, "fritzing-stripboard-body")
+    head, tail = ElementTree.tostring(svg_root).split(ElementTree.tostring(placeholder))
+    container.remove(placeholder)
+
+    output.write(head)
+    output.write(first)
+    shutil.copyfileobj(body, output)
+    output.write(tail)
 
-    return part_root, svg_root
 
+def write_part_entries(
+    board: BoardSpecification,
+    archive: zipfile.ZipFile,
+    svg_bodies: dict[str, IO[bytes]],
+    connectors_body: IO[bytes],
+    buses_body: IO[bytes],
+    connector_count: int,
+    bus_count: int,
+    svg_format: Optional[SvgFormat] = None,
+) -> None:
+    """Wrap already serialized elements in the part's documents.
 
-def build_zip(board: BoardSpecification, path: str) -> None:
-    fzp_document, svg_document = build_part_files(board)
+    ``svg_bodies`` holds a stream for each of ``VIEWS``; it and the
+    ``*_body`` streams hold the output of a ``StreamEmitter`` and are
+    read from their current position.
+    """
+    view_roots = build_view_roots(board, svg_format)
+    part_root = build_part_root(board)
 
-    archive = zipfile.ZipFile(path, mode="w")
     with archive.open(f"part.{board.meta.id}.fzp", "w") as fzpf:
-        fzpf.write(ElementTree.tostring(fzp_document))
+        fzpf.write(ElementTree.tostring(part_root)[: -len(close_tag(part_root))])
+        _write_section(fzpf, "connectors", connectors_body, connector_count)
+        _write_section(fzpf, "buses", buses_body, bus_count)
+        fzpf.write(close_tag(part_root))
+
+    for view, (svg_root, container) in view_roots.items():
+        with archive.open(get_svg_entry_name(board, view), "w") as svgf:
+            _write_svg_document(svgf, svg_root, container, svg_bodies[view])
 
-    with archive.open(f"svg.breadboard.{board.meta.id}.svg", "w") as svgf:
-        svgf.write(ElementTree.tostring(svg_document))
+
+def stream_part_files(
+    board: BoardSpecification,
+    archive: zipfile.ZipFile,
+    merge_overlaps: bool = False,
+    merge_nets: bool = False,
+    svg_format: Optional[SvgFormat] = None,
+    workers: Optional[int] = 1,
+    holes: Optional[BoardIR] = None,
+    tile_size: Optional[int] = None,
+    progress: Optional[ProgressMonitor] = None,
+    memory_limit: Optional[int] = None,
+) -> None:
+    """Write the part's documents into ``archive`` while they are generated.
+
+    Output is byte-identical to serializing the documents returned by
+    ``build_part_files``, but no per-hole element is ever built: a
+    ``TemplateEmitter`` formats connectors, buses and SVG elements from
+    string templates and spools them to temporary files until their
+    enclosing document can be written.
+    Handlers feed the stream directly rather than going through
+    ``BoardIR``, which would hold every hole in memory; with
+    ``merge_nets`` only the connector ids of each net are held until the
+    net table is written.
+    With ``workers`` other than 1, grids are serialized by a process pool
+    and their fragments written in grid order, unless merging needs to see
+    every grid's holes; then ``emit_board`` spreads the handlers instead.
+    Every hole placed is also recorded into ``holes``, if given, which
+    likewise needs the grids' holes in this process, as do ``tile_size``
+    and ``progress``; see ``emit_board``.
+
+    Spools are files on disk unless ``memory_limit`` is given; they then
+    share that many bytes of memory and are only moved to disk once they
+    outgrow their share.
+    """
+    with contextlib.ExitStack() as stack:
+        spool_count = len(VIEWS) + 2
+
+        def create_spool() -> IO[bytes]:
+            if memory_limit is None:
+                return stack.enter_context(tempfile.TemporaryFile())
+            return stack.enter_context(
+                tempfile.SpooledTemporaryFile(max_size=memory_limit // spool_count)
+            )
+
+        svg_spools = {view: create_spool() for view in VIEWS}
+        connectors_spool = create_spool()
+        buses_spool = create_spool()
+
+        if (
+            merge_overlaps
+            or merge_nets
+            or holes is not None
+            or tile_size is not None
+            or progress is not None
+            or not use_grid_workers(board.board, workers)
+        ):
+            emitter = create_view_emitter(
+                svg_spools, connectors_spool, buses_spool, svg_format
+            )
+            emit_board(
+                board,
+                emitter,
+                merge_overlaps=merge_overlaps,
+                merge_nets=merge_nets,
+                workers=workers,
+                tile_size=tile_size,
+                progress=progress,
+                holes=holes,
+            )
+            emitter.close()
+            connector_count = emitter.connector_count
+            bus_count = emitter.bus_count
+        else:
+            fragments = map_grids(
+                serialize_grid,
+                convert_board(board),
+                workers,
+                svg_precision=svg_format.precision if svg_format else None,
+            )
+            for fragment in fragments:
+                for view, svg in fragment.svgs.items():
+                    svg_spools[view].write(svg)
+                connectors_spool.write(fragment.connectors)
+                buses_spool.write(fragment.buses)
+                if svg_format is not None:
+                    svg_format.saved_bytes += fragment.saved_bytes
+            connector_count = sum(fragment.connector_count for fragment in fragments)
+            bus_count = sum(fragment.bus_count for fragment in fragments)
+
+        for spool in (*svg_spools.values(), connectors_spool, buses_spool):
+            spool.seek(0)
+
+        write_part_entries(
+            board,
+            archive,
+            svg_spools,
+            connectors_spool,
+            buses_spool,
+            connector_count,
+            bus_count,
+            svg_format,
+        )
+
+
+def write_zip(
+    board: BoardSpecification,
+    output: Union[str, IO[bytes]],
+    stream: bool = False,
+    merge_overlaps: bool = False,
+    merge_nets: bool = False,
+    compression: int = zipfile.ZIP_STORED,
+    compresslevel: Optional[int] = None,
+    svg_format: Optional[SvgFormat] = None,
+    workers: Optional[int] = 1,
+    holes: Optional[BoardIR] = None,
+    tile_size: Optional[int] = None,
+    progress: Optional[ProgressMonitor] = None,
+    memory_limit: Optional[int] = None,
+) -> None:
+    """Build ``board`` into a new archive at ``output``.
+
+    ``output`` may be a path or a binary file object, which need not be
+    seekable; the archive is always closed (but the file object is not)
+    once the call returns.  ``memory_limit`` only applies to ``stream``
+    builds; see ``stream_part_files``.
+    """
+    options = {
+        "merge_overlaps": merge_overlaps,
+        "merge_nets": merge_nets,
+        "svg_format": svg_format,
+        "workers": workers,
+        "holes": holes,
+        "tile_size": tile_size,
+        "progress": progress,
+    }
+
+    with zipfile.ZipFile(
+        output, mode="w", compression=compression, compresslevel=compresslevel
+    ) as archive:
+        if stream:
+            with phase("stream_part_files"):
+                stream_part_files(board, archive, memory_limit=memory_limit, **options)
+        else:
+            with phase("build_part_files"):
+                fzp_document, svg_documents = build_part_files(board, **options)
+
+            with phase("serialize"):
+                fzp_bytes = ElementTree.tostring(fzp_document)
+                svg_bytes = {
+                    view: ElementTree.tostring(document)
+                    for view, document in svg_documents.items()
+                }
+            del fzp_document, svg_documents
+
+            with phase("write_archive"):
+                with archive.open(f"part.{board.meta.id}.fzp", "w") as fzpf:
+                    fzpf.write(fzp_bytes)
+
+                for view, svg in svg_bytes.items():
+                    with archive.open(get_svg_entry_name(board, view), "w") as svgf:
+                        svgf.write(svg)
+
+
+def build_zip(
+    board: BoardSpecification,
+    output: Union[str, IO[bytes]],
+    stream: bool = False,
+    cache: Optional[Union[str, BuildCache]] = None,
+    merge_overlaps: bool = False,
+    merge_nets: bool = False,
+    compression: int = zipfile.ZIP_STORED,
+    compresslevel: Optional[int] = None,
+    svg_format: Optional[SvgFormat] = None,
+    workers: Optional[int] = 1,
+    holes: Optional[BoardIR] = None,
+    tile_size: Optional[int] = None,
+    progress: Optional[ProgressMonitor] = None,
+    memory_limit: Optional[int] = None,
+) -> None:
+    """Write ``board``'s part archive to ``output``, a path or file object.
+
+    ``compression`` and ``compresslevel`` are passed to ``ZipFile``, e.g.
+    ``zipfile.ZIP_DEFLATED`` to trade build time for a smaller archive.
+    ``svg_format`` selects compact SVG output; its ``saved_bytes`` is
+    left at zero when the archive comes from ``cache``.  ``workers`` sets
+    how many processes build the board's grids; it does not change the
+    archive, so it is not part of the cache key; nor do ``tile_size``,
+    ``progress`` or ``memory_limit``, which are passed to ``write_zip``.
+
+    Every hole, trace and bus of the build is also recorded into
+    ``holes``, if given, for the writers in ``exports``; the archive is
+    then always built, though still stored in ``cache``.
+    """
+    options = {
+        "merge_overlaps": merge_overlaps,
+        "merge_nets": merge_nets,
+        "compression": compression,
+        "compresslevel": compresslevel,
+    }
+    cache_options = {
+        **options,
+        "svg_precision": svg_format.precision if svg_format is not None else None,
+    }
+
+    if isinstance(cache, str):
+        cache = BuildCache(cache)
+    if cache is None:
+        write_zip(
+            board,
+            output,
+            stream=stream,
+            svg_format=svg_format,
+            workers=workers,
+            holes=holes,
+            tile_size=tile_size,
+            progress=progress,
+            memory_limit=memory_limit,
+            **options,
+        )
+        return
+
+    if holes is None:
+        with phase("cache_fetch"):
+            if cache.fetch(board, output, cache_options):
+                return
+
+    if isinstance(output, str):
+        write_zip(
+            board,
+            output,
+            stream=stream,
+            svg_format=svg_format,
+            workers=workers,
+            holes=holes,
+            tile_size=tile_size,
+            progress=progress,
+            memory_limit=memory_limit,
+            **options,
+        )
+        with phase("cache_store"):
+            cache.store(board, output, cache_options)
+        return
+
+    # File objects may not be readable or seekable, so the archive is
+    # built in a temporary file that can be both stored and copied.
+    with tempfile.TemporaryFile() as archive:
+        write_zip(
+            board,
+            archive,
+            stream=stream,
+            svg_format=svg_format,
+            workers=workers,
+            holes=holes,
+            tile_size=tile_size,
+            progress=progress,
+            memory_limit=memory_limit,
+            **options,
+        )
+        with phase("cache_store"):
+            archive.seek(0)
+            cache.store(board, archive, cache_options)
+        archive.seek(0)
+        shutil.copyfileobj(archive, output)
+
+
+def build_zip_bytes(board: BoardSpecification, **kwargs) -> bytes:
+    """Build ``board``'s part archive in memory; see ``build_zip``."""
+    output = io.BytesIO()
+    build_zip(board, output, **kwargs)
+    return output.getvalue()
@@ -0,0 +1,37 @@
+import pytest
+
+from fritzing_stripboard.types import BoardSpecification
+
+
+#: Board metadata used by ``make_board`` unless overridden; the date is
+#: fixed so that separately built archives can be compared.
+BOARD_META = {
+    "id": "board",
+    "width": 20,
+    "height": 20,
+    "title": "Test",
+    "label": "Test",
+    "date": "2020-01-01T00:00:00",
+}
+
+
+@pytest.fixture
+def make_board():
+    """Build a ``BoardSpecification`` from its grids and metadata.
+
+    Each grid is a list of components, or a dict with ``components`` and
+    optionally ``meta``; keyword arguments override ``BOARD_META``.
+    """
+
+    def make_board(*grids, **meta) -> BoardSpecification:
+        return BoardSpecification.parse_obj(
+            {
+                "meta": {**BOARD_META, **meta},
+                "board": [
+                    {"grid": grid if isinstance(grid, dict) else {"components": grid}}
+                    for grid in grids
+                ],
+            }
+        )
+
+    return make_board
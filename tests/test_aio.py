@@ -0,0 +1,29 @@
+import asyncio
+import time
+
+import pytest
+
+from fritzing_stripboard.aio import build_part_files_async, build_zip_async
+from fritzing_stripboard.benchmark import generate_spec
+from fritzing_stripboard.types import BoardSpecification
+
+
+@pytest.fixture(scope="module")
+def large_board():
+    return BoardSpecification.parse_obj(generate_spec(200000))
+
+
+async def cancel_after(build, delay):
+    task = asyncio.create_task(build)
+    await asyncio.sleep(delay)
+    task.cancel()
+    cancelled = time.perf_counter()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    return time.perf_counter() - cancelled
+
+
+@pytest.mark.parametrize("build", [build_zip_async, build_part_files_async])
+@pytest.mark.parametrize("delay", [0.2, 1.0])
+def test_cancelled_build_returns_promptly(large_board, build, delay):
+    assert asyncio.run(cancel_after(build(large_board), delay)) < 1.0
@@ -0,0 +1,76 @@
+import json
+import os
+import shutil
+
+import pytest
+import yaml
+
+from fritzing_stripboard import cli
+from fritzing_stripboard.batch import build_batch, collect_specs, get_output_paths
+
+
+TEST_SPEC = os.path.join(os.path.dirname(__file__), "test.yaml")
+
+
+def test_specs_with_the_same_name_keep_their_directories(tmp_path):
+    for directory in ("a", "b"):
+        os.makedirs(tmp_path / "specs" / directory)
+        shutil.copy(TEST_SPEC, tmp_path / "specs" / directory / "board.yaml")
+    output_dir = tmp_path / "parts"
+
+    summary = build_batch(
+        collect_specs([str(tmp_path / "specs" / "**" / "*.yaml")]),
+        str(output_dir),
+        workers=1,
+    )
+
+    assert not summary.failures
+    assert sorted(result.output for result in summary.results) == [
+        str(output_dir / "a" / "board.fzpz"),
+        str(output_dir / "b" / "board.fzpz"),
+    ]
+    assert all(os.path.exists(result.output) for result in summary.results)
+
+
+def test_specs_sharing_an_output_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="would both be built to"):
+        get_output_paths(
+            [str(tmp_path / "board.yaml"), str(tmp_path / "board.yml")],
+            str(tmp_path / "parts"),
+        )
+
+
+def test_directories_include_json_specs(tmp_path):
+    with open(TEST_SPEC) as inf:
+        data = yaml.safe_load(inf)
+    os.makedirs(tmp_path / "specs")
+    shutil.copy(TEST_SPEC, tmp_path / "specs" / "board.yaml")
+    with open(tmp_path / "specs" / "other.json", "w") as outf:
+        json.dump(data, outf)
+
+    paths = collect_specs([str(tmp_path / "specs")])
+    summary = build_batch(paths, str(tmp_path / "parts"), workers=1)
+
+    assert [os.path.basename(path) for path in paths] == ["board.yaml", "other.json"]
+    assert not summary.failures
+    assert os.path.exists(tmp_path / "parts" / "other.fzpz")
+
+
+def test_batch_command_uses_one_worker_per_cpu_for_zero_jobs(tmp_path):
+    os.makedirs(tmp_path / "specs")
+    shutil.copy(TEST_SPEC, tmp_path / "specs" / "board.yaml")
+    output_dir = tmp_path / "parts"
+
+    status = cli.batch(
+        [
+            "fritzing-stripboard-batch",
+            str(tmp_path / "specs"),
+            "--output-dir",
+            str(output_dir),
+            "-j",
+            "0",
+        ]
+    )
+
+    assert status == 0
+    assert os.path.exists(output_dir / "board.fzpz")
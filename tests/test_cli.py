@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import zipfile
+
+from fritzing_stripboard import cli
+from fritzing_stripboard.benchmark import measure_startup
+
+
+TEST_SPEC = os.path.join(os.path.dirname(__file__), "test.yaml")
+
+#: Generous bounds on ``measure_startup``'s timings, in seconds.
+MAX_STARTUP = {"import": 1.0, "check": 1.5, "build": 3.0}
+
+
+def get_loaded_xml_modules(code):
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys\n{code}\n"
+            "print(sorted(name for name in sys.modules if name.startswith('xml')))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return loaded.strip()
+
+
+def test_import_does_not_load_xml():
+    assert get_loaded_xml_modules("import fritzing_stripboard.cli") == "[]"
+
+
+def test_check_does_not_load_xml():
+    code = (
+        "from fritzing_stripboard import cli\n"
+        f"assert cli.main(['fritzing-stripboard', {TEST_SPEC!r}, '--check']) == 0"
+    )
+    assert get_loaded_xml_modules(code) == "[]"
+
+
+def test_startup_time():
+    seconds = measure_startup(repeat=3)
+    assert {
+        name: elapsed
+        for name, elapsed in seconds.items()
+        if elapsed > MAX_STARTUP[name]
+    } == {}
+
+
+def test_svg_savings_are_measured_against_the_breadboard_view(tmp_path, capsys):
+    full = str(tmp_path / "full.fzpz")
+    compact = str(tmp_path / "compact.fzpz")
+    cli.main(["fritzing-stripboard", TEST_SPEC, full])
+    cli.main(["fritzing-stripboard", TEST_SPEC, compact, "--compact-svg"])
+
+    with zipfile.ZipFile(full) as archive:
+        (breadboard,) = [
+            info for info in archive.infolist() if info.filename.startswith("svg.bread")
+        ]
+    assert f" of {breadboard.file_size} bytes)" in capsys.readouterr().err
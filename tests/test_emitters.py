@@ -0,0 +1,74 @@
+import io
+from xml.etree import ElementTree
+
+import pytest
+
+from fritzing_stripboard.emitters import (
+    EXTRA_VIEWS,
+    SvgFormat,
+    TemplateEmitter,
+    TreeEmitter,
+    escape_attribute,
+)
+from fritzing_stripboard.zip import build_zip_bytes
+
+
+IDS = ["plain", "a&b", "<c>", 'say "d"', "café", "漢字 \U0001f50c", "e\tf\ng"]
+
+
+def emit(emitter, bus_id):
+    bus = emitter.add_bus(bus_id)
+    empty = emitter.add_bus(f"{bus_id}-empty")
+    emitter.add_line(f"{bus_id}-trace", (0.5, 1.0), (2.25, 1.0))
+    emitter.add_hole(f"{bus_id}-0", bus_id, (0.5, 1.0), bus)
+    emitter.add_hole(f"{bus_id}-1", f"{bus_id}&1", (2.25, 1.0), bus, drilled=False)
+    emitter.add_hole(f"{bus_id}-2", f"{bus_id}<2>", (4.0, 1.0), None)
+    emitter.add_node_member(f"{bus_id}<2>", empty)
+
+
+def serialize_children(element):
+    return b"".join(ElementTree.tostring(child) for child in element)
+
+
+@pytest.mark.parametrize("precision", [None, 2])
+@pytest.mark.parametrize("bus_id", IDS)
+def test_template_matches_tree(bus_id, precision):
+    svg_format = SvgFormat(precision) if precision is not None else None
+    tree = TreeEmitter(
+        *(ElementTree.Element(tag) for tag in ("svg", "connectors", "buses")),
+        svg_format,
+        view_elements={view: ElementTree.Element(view) for view in EXTRA_VIEWS},
+    )
+    files = [io.BytesIO() for _ in range(3)]
+    view_files = {view: io.BytesIO() for view in EXTRA_VIEWS}
+    template = TemplateEmitter(*files, svg_format, view_files=view_files)
+
+    emit(tree, bus_id)
+    emit(template, bus_id)
+    template.close()
+
+    assert [
+        serialize_children(element)
+        for element in (tree.svg_element, tree.connectors_element, tree.buses_element)
+    ] == [file.getvalue() for file in files]
+    for view, element in tree.view_elements.items():
+        assert serialize_children(element) == view_files[view].getvalue()
+
+
+@pytest.mark.parametrize("value", IDS)
+def test_escape_attribute_matches_element_tree(value):
+    serialized = ElementTree.tostring(ElementTree.Element("a", b=value), "unicode")
+    assert serialized == f'<a b="{escape_attribute(value)}" />'
+
+
+def test_streamed_archive_escapes_ids(make_board):
+    board = make_board(
+        [
+            {"id": component_id, "drilled_rows": f"A{row}:C{row}"}
+            for row, component_id in enumerate(IDS, 1)
+        ],
+        id="board & <more>",
+        title='The "board"',
+    )
+
+    assert build_zip_bytes(board, stream=True) == build_zip_bytes(board)
@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+
+import pytest
+
+from fritzing_stripboard.exports import write_excellon, write_hole_csv, write_hole_json
+from fritzing_stripboard.ir import BoardIR
+from fritzing_stripboard.zip import build_zip_bytes
+
+
+COLUMNS = {"id": "cols", "drilled_columns": "A1:C2"}
+ROW = {"id": "row", "drilled_rows": "A1:C1"}
+
+
+@pytest.fixture
+def build_holes(make_board):
+    def build_holes(components, **kwargs):
+        board = make_board(components)
+        holes = BoardIR()
+        build_zip_bytes(board, holes=holes, **kwargs)
+        return board, holes
+
+    return build_holes
+
+
+def read_hole_table(holes):
+    output = io.StringIO()
+    write_hole_csv(holes, output)
+    output.seek(0)
+    return {row["hole"]: row["net"] for row in csv.DictReader(output)}
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_columns_keep_a_net_each(build_holes, stream):
+    _, holes = build_holes([COLUMNS], stream=stream)
+
+    assert read_hole_table(holes) == {
+        f"cols-{x}-{idx}": f"cols-{x}" for x in range(3) for idx in range(2)
+    }
+
+
+@pytest.mark.parametrize("merge_overlaps", [False, True])
+@pytest.mark.parametrize("stream", [False, True])
+def test_holes_in_the_same_place_share_a_net(build_holes, stream, merge_overlaps):
+    board, holes = build_holes(
+        [COLUMNS, ROW], stream=stream, merge_overlaps=merge_overlaps
+    )
+
+    nets = read_hole_table(holes)
+    assert len(nets) == 9
+    assert set(nets.values()) == {"cols-0"}
+
+    output = io.StringIO()
+    write_hole_json(holes, output)
+    assert json.loads(output.getvalue())["nets"] == {"cols-0": list(nets)}
+
+    assert write_excellon(board, holes, io.StringIO()) == 6
@@ -0,0 +1,85 @@
+import pytest
+
+from fritzing_stripboard import grid
+from fritzing_stripboard.types import GridMetadata
+from fritzing_stripboard.zip import build_zip_bytes
+
+
+pytestmark = pytest.mark.skipif(grid.get_numpy() is None, reason="needs NumPy")
+
+FRONT = GridMetadata(origin=(3.5, 7.25), pitch=2.54)
+BACK = GridMetadata(origin=(50.5, 0), pitch=2.54, back=True)
+
+#: (start, end) cell coordinates, including reversed and single-cell ranges.
+RANGES = [
+    ((0, 0), (0, 0)),
+    ((7, 3), (7, 3)),
+    ((0, 0), (19, 35)),
+    ((19, 35), (0, 0)),
+    ((5, 0), (5, 299)),
+    ((299, 4), (0, 4)),
+]
+
+GRIDS = [
+    {
+        "meta": {"origin": list(meta.origin), "back": meta.back},
+        "components": [
+            {"id": "single", "drilled_rows": "C4:C4"},
+            {"id": "rows", "drilled_rows": "T36:A1"},
+            {"id": "columns", "drilled_columns": "Q30:B2"},
+            {"id": "line", "bus": "E40:E1"},
+            {"id": "pad", "bus": "H8:H8"},
+        ],
+    }
+    for meta in (FRONT, BACK)
+]
+
+
+def run(monkeypatch, use_numpy, function, *args):
+    with monkeypatch.context() as patch:
+        if use_numpy:
+            patch.setattr(grid, "NUMPY_MIN_CELLS", 1)
+        else:
+            patch.setattr(grid, "get_numpy", lambda: None)
+        grid._get_cached_axis_positions.cache_clear()
+        try:
+            return function(*args)
+        finally:
+            grid._get_cached_axis_positions.cache_clear()
+
+
+@pytest.mark.parametrize("meta", [FRONT, BACK], ids=["front", "back"])
+@pytest.mark.parametrize("start, end", RANGES)
+def test_positions_match_without_numpy(monkeypatch, meta, start, end):
+    expected = run(monkeypatch, False, grid.get_drill_position_arrays, start, end, meta)
+    actual = run(monkeypatch, True, grid.get_drill_position_arrays, start, end, meta)
+
+    assert actual == expected
+    for axis in (0, 1):
+        assert run(
+            monkeypatch,
+            True,
+            grid.get_axis_positions,
+            start[axis],
+            end[axis],
+            meta,
+            axis,
+        ) == run(
+            monkeypatch,
+            False,
+            grid.get_axis_positions,
+            start[axis],
+            end[axis],
+            meta,
+            axis,
+        )
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_archive_matches_without_numpy(monkeypatch, make_board, stream):
+    board = make_board(*GRIDS, width=60, height=120)
+
+    def build():
+        return build_zip_bytes(board, stream=stream)
+
+    assert run(monkeypatch, True, build) == run(monkeypatch, False, build)
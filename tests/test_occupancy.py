@@ -0,0 +1,30 @@
+import io
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+
+from fritzing_stripboard.zip import build_zip_bytes
+
+
+PAD = {"id": "pad", "bus": "A1:A3"}
+ROW = {"id": "row", "drilled_rows": "A1:C1"}
+
+
+def get_connector_types(archive_bytes):
+    with zipfile.ZipFile(io.BytesIO(archive_bytes)) as archive:
+        fzp = archive.read("part.board.fzp")
+    return sorted(
+        connector.get("type")
+        for connector in ElementTree.fromstring(fzp).iter("connector")
+    )
+
+
+@pytest.mark.parametrize("components", [[PAD, ROW], [ROW, PAD]])
+@pytest.mark.parametrize("stream", [False, True])
+def test_merged_pad_keeps_drilled_hole(make_board, components, stream):
+    archive = build_zip_bytes(
+        make_board(components), stream=stream, merge_overlaps=True
+    )
+
+    assert get_connector_types(archive) == ["female"] * 3 + ["pad"] * 2
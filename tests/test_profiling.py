@@ -0,0 +1,67 @@
+import dataclasses
+
+import pytest
+
+from fritzing_stripboard.ir import BoardIR
+from fritzing_stripboard.model import Grid, GridGeometry
+from fritzing_stripboard.profiling import profile
+from fritzing_stripboard.zip import (
+    build_zip_bytes,
+    compile_plan,
+    get_grid_components,
+    register_handler,
+    run_plan,
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class MountingHoles:
+    id: str
+    count: int
+
+
+@register_handler(MountingHoles)
+def handle_mounting_holes(emitter, config, **kwargs):
+    for index in range(config.count):
+        hole_id = f"{config.id}-{index}"
+        emitter.add_hole(hole_id, hole_id, (index * 5.0, 0.0), None)
+
+
+@pytest.fixture
+def board(make_board):
+    return make_board(
+        *(
+            {
+                "meta": {"origin": [0, y]},
+                "components": [{"id": f"rows-{y}", "drilled_rows": "A1:G7"}],
+            }
+            for y in (0, 20)
+        ),
+        height=40,
+    )
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_profiles_builds_with_workers(board, stream):
+    with profile() as serial:
+        expected = build_zip_bytes(board, stream=stream)
+    with profile() as parallel:
+        archive = build_zip_bytes(board, stream=stream, workers=2)
+
+    assert archive == expected
+    assert parallel.get_report()["totals"] == serial.get_report()["totals"]
+    assert parallel.get_report()["totals"]["connectors"] > 0
+
+
+def test_counts_no_node_members_for_holes_without_a_bus():
+    grid = Grid(GridGeometry(2.54, (0.0, 0.0), False), (MountingHoles("mount", 3),))
+    holes = BoardIR()
+    with profile() as profiler:
+        run_plan(compile_plan(get_grid_components([grid])), holes)
+
+    (stats,) = profiler.get_report()["components"]
+    assert (stats["circles"], stats["connectors"], stats["node_members"]) == (
+        holes.hole_count,
+        holes.hole_count,
+        0,
+    )
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from fritzing_stripboard.benchmark import generate_spec
+from fritzing_stripboard.server import HTTPError, request_build, serve
+
+
+SLOW_SPEC = json.dumps(generate_spec(5000)).encode("utf-8")
+SMALL_SPEC = json.dumps(
+    {"meta": {"width": 10, "height": 10, "title": "Test", "label": "T"}}
+).encode("utf-8")
+
+
+@pytest.fixture
+def unix_socket(tmp_path):
+    path = str(tmp_path / "server.sock")
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    tasks = []
+
+    async def run():
+        listening = asyncio.Event()
+        task = asyncio.create_task(
+            serve(
+                unix_socket=path,
+                ready=listening,
+                workers=1,
+                queue_size=0,
+                timeout=0.05,
+            )
+        )
+        tasks.append(task)
+        await listening.wait()
+        ready.set()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(run(),))
+    thread.start()
+    assert ready.wait(30)
+    yield path
+
+    loop.call_soon_threadsafe(tasks[0].cancel)
+    thread.join(30)
+    loop.close()
+
+
+def request(path, spec):
+    return request_build(
+        spec, unix_socket=path, content_type="application/json", timeout=30
+    )
+
+
+def test_timed_out_build_keeps_its_worker(unix_socket):
+    with pytest.raises(HTTPError) as timeout:
+        request(unix_socket, SLOW_SPEC)
+    assert timeout.value.status == 504
+
+    # The timed-out build is still running on the only worker.
+    with pytest.raises(HTTPError) as rejected:
+        request(unix_socket, SMALL_SPEC)
+    assert rejected.value.status == 503
+
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            archive = request(unix_socket, SMALL_SPEC)
+            break
+        except HTTPError as exc:
+            assert exc.status == 503 and time.monotonic() < deadline
+            time.sleep(0.05)
+    assert archive[:2] == b"PK"
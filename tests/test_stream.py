@@ -0,0 +1,66 @@
+import io
+import os
+import zipfile
+
+import pytest
+import yaml
+
+from fritzing_stripboard.benchmark import generate_spec
+from fritzing_stripboard.emitters import SvgFormat
+from fritzing_stripboard.types import BoardSpecification
+from fritzing_stripboard.zip import build_zip_bytes
+
+
+TEST_SPEC = os.path.join(os.path.dirname(__file__), "test.yaml")
+DATE = "2020-01-01T00:00:00"
+
+
+def fix_ids(components, prefix):
+    # Components without an id get a random one, which would make
+    # separately loaded specs differ.
+    for index, component in enumerate(components):
+        component.setdefault("id", f"{prefix}{index}")
+        if "shared_bus" in component:
+            fix_ids(component["shared_bus"], f"{prefix}{index}-")
+
+
+def load_test_spec():
+    with open(TEST_SPEC) as inf:
+        data = yaml.safe_load(inf)
+    for index, grid in enumerate(data["board"]):
+        fix_ids(grid["grid"]["components"], f"grid{index}-")
+    data["meta"].update(id="test", date=DATE)
+    return data
+
+
+def load_generated_spec():
+    data = generate_spec(3000, density=0.3)
+    data["meta"].update(id="generated", date=DATE)
+    return data
+
+
+def read_archive(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+@pytest.mark.parametrize("load_spec", [load_test_spec, load_generated_spec])
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"merge_overlaps": True},
+        {"merge_nets": True},
+        {"svg_format": SvgFormat(2)},
+        {"workers": 2},
+    ],
+    ids=["plain", "merge_overlaps", "merge_nets", "compact_svg", "workers"],
+)
+def test_streamed_archive_matches_tree(load_spec, options):
+    tree = build_zip_bytes(BoardSpecification.parse_obj(load_spec()), **options)
+    streamed = build_zip_bytes(
+        BoardSpecification.parse_obj(load_spec()), stream=True, **options
+    )
+
+    assert read_archive(streamed) == read_archive(tree)
+    assert streamed == tree
@@ -0,0 +1,61 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from fritzing_stripboard import cli
+from fritzing_stripboard.emitters import SvgFormat
+from fritzing_stripboard.loader import load_specification
+from fritzing_stripboard.watch import IncrementalBuilder
+from fritzing_stripboard.zip import build_zip_bytes
+
+
+TEST_SPEC = os.path.join(os.path.dirname(__file__), "test.yaml")
+
+
+@pytest.mark.parametrize(
+    "flags",
+    [
+        ["--merge-overlaps"],
+        ["--merge-nets"],
+        ["-j", "2"],
+        ["--profile", "profile.json"],
+        ["--progress"],
+        ["--drill", "board.drl"],
+    ],
+)
+def test_watch_rejects_unsupported_flags(tmp_path, capsys, flags):
+    output = str(tmp_path / "part.fzpz")
+    with pytest.raises(SystemExit):
+        cli.main(["fritzing-stripboard", TEST_SPEC, output, "--watch", *flags])
+    assert "cannot be used with --watch" in capsys.readouterr().err
+
+
+def test_incremental_builds_use_compression(tmp_path):
+    output = str(tmp_path / "part.fzpz")
+    with open(TEST_SPEC) as inf:
+        board = load_specification(inf)
+
+    IncrementalBuilder(compression=zipfile.ZIP_DEFLATED).build(board, output)
+
+    with zipfile.ZipFile(output) as archive:
+        assert {info.compress_type for info in archive.infolist()} == {
+            zipfile.ZIP_DEFLATED
+        }
+
+
+def test_incremental_builds_match_compact_svg_builds(tmp_path):
+    output = str(tmp_path / "part.fzpz")
+    with open(TEST_SPEC) as inf:
+        board = load_specification(inf)
+
+    IncrementalBuilder(svg_format=SvgFormat(2)).build(board, output)
+
+    expected = zipfile.ZipFile(
+        io.BytesIO(build_zip_bytes(board, svg_format=SvgFormat(2)))
+    )
+    with zipfile.ZipFile(output) as archive:
+        assert archive.namelist() == expected.namelist()
+        for name in archive.namelist():
+            assert archive.read(name) == expected.read(name)